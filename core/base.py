@@ -1,27 +1,195 @@
 import asyncio
+import codecs
+import math
 import random
 
-from urllib.parse import urljoin
+from functools import lru_cache
+from typing import Iterable, Optional
+from urllib.parse import urlencode, urljoin
 
 import aiohttp
 from loguru import logger
-from bs4 import Tag, BeautifulSoup
+from bs4 import Tag, BeautifulSoup, SoupStrainer
+from bs4.dammit import EncodingDetector
 from fake_headers import Headers
 
+from core.limits import AdaptiveLimiter, ServiceOverloadError, TokenBucket
+
+try:
+    import lxml.html
+except ImportError as e:
+    raise ImportError("Для парсинга требуется lxml: pip install lxml") from e
+
+
+# Результат _fetch_once для страницы, которая уже загружалась в текущем обходе
+ALREADY_FETCHED = object()
+
+
+def resolve_charset(html: bytes, charset: Optional[str] = None) -> str:
+    """
+    Определяет кодировку страницы.
+    
+    Приоритет: charset из Content-Type, затем <meta charset> документа, затем UTF-8.
+    Неизвестные Python имена кодировок пропускаются.
+    """
+    for candidate in (charset, EncodingDetector.find_declared_encoding(html, is_html=True)):
+        if not candidate:
+            continue
+        try:
+            codecs.lookup(candidate)
+        except LookupError:
+            logger.debug("Неизвестная кодировка: {}", candidate)
+            continue
+        return candidate
+    return 'utf-8'
+
+
+@lru_cache(maxsize=8)
+def lxml_parser(charset: str) -> lxml.html.HTMLParser:
+    """HTML-парсер lxml с явно заданной кодировкой, чтобы libxml2 не угадывал её сам."""
+    return lxml.html.HTMLParser(encoding=charset)
+
+
+def create_session(base_url: str, *, max_workers: int = 5) -> aiohttp.ClientSession:
+    """
+    Создаёт HTTP-сессию с пулом keep-alive соединений.
+    
+    Соединения переиспользуются между запросами, поэтому TLS-рукопожатие
+    выполняется один раз на соединение, а не на каждую страницу.
+    
+    Общие для всех запросов заголовки (Referer, Accept) задаются
+    на уровне сессии, парсеры добавляют только ротируемый User-Agent.
+    
+    Коннектор ограничивает число одновременных соединений значением
+    max_workers, поэтому нагрузка на сайт не превышает его, сколько бы
+    парсеров ни использовали сессию одновременно. Это только верхняя
+    граница: реальным числом запросов управляет общий AdaptiveLimiter
+    парсеров (см. BaseParser), его max_limit равен тому же max_workers,
+    поэтому запросы не ждут свободного соединения в пуле.
+    
+    Args:
+        base_url: Базовый URL сайта, используется как Referer
+        max_workers: Количество одновременных запросов парсеров
+    
+    Returns:
+        Сессия, которую нужно закрыть после работы (async with)
+    """
+    connector = aiohttp.TCPConnector(
+        limit=max_workers,
+        limit_per_host=max_workers,
+        keepalive_timeout=30,
+        enable_cleanup_closed=True,
+        ttl_dns_cache=600
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={
+            'Connection': 'keep-alive',
+            'Referer': base_url,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+        },
+        raise_for_status=False
+    )
+
+
+def create_bucket(*, max_workers: int = 5, sleep_time: float = 3) -> TokenBucket:
+    """
+    Создаёт token bucket с частотой max_workers / sleep_time запросов в секунду.
+    
+    Args:
+        max_workers: Количество одновременных запросов парсеров
+        sleep_time: Время, за которое допускается max_workers запросов (0 - без ограничения)
+    
+    Returns:
+        TokenBucket с запасом на всплеск до max_workers * 2 запросов
+    """
+    return TokenBucket(
+        rate=max_workers / sleep_time if sleep_time > 0 else math.inf,
+        capacity=max_workers * 2
+    )
+
+
+class TagStrainer(SoupStrainer):
+    """
+    SoupStrainer, оставляющий в дереве только нужные поддеревья страницы.
+    
+    Тег верхнего уровня сохраняется (вместе со всем содержимым), если
+    совпадает его имя, id или хотя бы один из классов. Остальная
+    разметка в дерево BeautifulSoup не попадает.
+    """
+    
+    def __init__(self, *, names: Iterable[str] = (), ids: Iterable[str] = (), classes: Iterable[str] = ()):
+        super().__init__()
+        self.names = frozenset(names)
+        self.ids = frozenset(ids)
+        self.classes = frozenset(classes)
+    
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        if name in self.names:
+            return True
+        if not attrs:
+            return False
+        if self.ids and attrs.get('id') in self.ids:
+            return True
+        if self.classes and (classes := attrs.get('class')):
+            if isinstance(classes, str):
+                classes = classes.split()
+            return not self.classes.isdisjoint(classes)
+        return False
+    
+    def allow_string_creation(self, string: str) -> bool:
+        return False
+
 
 class BaseParser:
-    def __init__(self, session: aiohttp.ClientSession, base_url: str, parse_engine: str = 'html.parser', *, max_workers: int = 5, sleep_time: int = 3):
+    """
+    Базовый парсер с повторными попытками и ограничением нагрузки.
+    
+    Число одновременных запросов задаёт AdaptiveLimiter: он стартует с
+    max_workers, уменьшается при перегрузке сервера и не превышает
+    max_workers, то есть лимит коннектора сессии (create_session).
+    Парсеры одной сессии должны получать общий limiter, иначе их
+    лимиты суммируются и запросы ждут соединения в пуле.
+    
+    Частоту запросов задаёт TokenBucket (create_bucket). По той же
+    причине он должен быть общим для всех парсеров одного сайта.
+    """
+    
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        parse_engine: str = 'lxml',
+        *,
+        max_workers: int = 5,
+        sleep_time: int = 3,
+        seen: Optional[set[str]] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        bucket: Optional[TokenBucket] = None
+    ):
         self._session = session
         self._base_url = base_url
         self.parse_engine = parse_engine
         self.sleep_time = sleep_time
+        # Уже обработанные URL, может быть общим для нескольких парсеров
+        self._seen: set[str] = seen if seen is not None else set()
         
-        self.semaphore = asyncio.Semaphore(max_workers)
+        # Ограничитель одновременных запросов, может быть общим для нескольких парсеров
+        self._limiter = limiter if limiter is not None else AdaptiveLimiter(max_workers, max_limit=max_workers)
+        # Ограничитель частоты запросов, может быть общим для нескольких парсеров
+        self._bucket = bucket if bucket is not None else create_bucket(max_workers=max_workers, sleep_time=sleep_time)
         self.headers = Headers(
             browser="chrome",
             os="win",
             headers=True
         )
+        # Заранее сгенерированный набор User-Agent вместо generate() на каждый запрос.
+        # Остальные заголовки fake_headers (Accept, Referer и др.) не берём,
+        # чтобы они не перекрывали заголовки сессии
+        self._hdr_pool = [
+            {'User-Agent': self.headers.generate()['User-Agent']}
+            for _ in range(16)
+        ]
     
     def _safe_extract_url(self, tag: Tag, attr: str):
         try:
@@ -32,62 +200,102 @@ class BaseParser:
         except Exception as e:
             logger.error(f"Ошибка при вытаскивании URL: {e}")
     
-    async def _fetch(self, url: str, *args, **kwargs) -> BeautifulSoup | None:
-        async with self.semaphore:
-            delay = self.sleep_time + random.uniform(-0.5, 1.0)
-            await asyncio.sleep(max(2.0, delay))  # минимум 2 секунды
+    async def _fetch(
+        self, 
+        url: str, 
+        *args, 
+        raw: bool = False, 
+        strainer: Optional[SoupStrainer] = None, 
+        **kwargs
+    ) -> BeautifulSoup | tuple[bytes, str] | None:
+        """
+        Загружает страницу с повторами при временных ошибках.
+        
+        При raw=True возвращает пару (байты, кодировка) без разбора в bs4.
+        """
+        delay = 0.0
+        for attempt in range(1, 4):
+            # Пауза только перед повторной попыткой после временной ошибки
+            if delay:
+                logger.info(f"Ждем {delay:.1f} сек перед повторной попыткой")
+                await asyncio.sleep(delay)
             
-            for attempt in range(1, 4):
-                try:
-                    if attempt > 1:
-                        wait_time = self.sleep_time * (2 ** (attempt - 1)) + random.uniform(1, 5)
-                        logger.info(f"Ждем {wait_time:.1f} сек перед повторной попыткой")
-                        await asyncio.sleep(wait_time)
-                    
-                    logger.info(f"Попытка #{attempt}: {url}")
+            try:
+                await self._bucket.acquire(1)
+                logger.info(f"Попытка #{attempt}: {url}")
+                async with self._limiter.use():
                     async with self._session.get(
                         url, 
                         headers=self._get_headers(),
                         timeout=aiohttp.ClientTimeout(total=30),
                         *args, **kwargs
                     ) as response:
-                        if response.status == 429:
-                            logger.warning("🚨 Rate limit! Делаем длинную паузу")
-                            await asyncio.sleep(60)
-                            continue
-                        
-                        elif response.status == 403:
-                            logger.error("💀 Полный бан! Останавливаемся")
-                            return 
+                        if response.status in (429, 503):
+                            raise ServiceOverloadError(response.status)
                         
                         response.raise_for_status()
                         logger.success(f"✅ Успешно: {url}")
-                        return BeautifulSoup(await response.text(), self.parse_engine)
-                        
-                except aiohttp.ClientResponseError as e:
-                    if 500 <= e.status < 600:
-                        logger.warning(f"🔧 Серверная ошибка {e.status}, пробуем снова...")
-                        continue
-                    elif e.status == 404:
-                        logger.warning(f"❌ 404: {url}")
-                        return None
-                    else:
-                        logger.warning(f"⚠️ Код {e.status}: {url}")
-                        continue
-                        
-                except asyncio.TimeoutError:
-                    logger.warning(f"⏰ Таймаут попытка #{attempt}")
-                    continue
-                except Exception as e:
-                    logger.warning(f"⚠️ Ошибка: {type(e).__name__}")
-                    continue
+                        html = await response.read()
+                        # Кодировка из Content-Type избавляет bs4 от поиска <meta charset> и угадывания
+                        charset = response.charset
+                
+                if raw:
+                    return html, resolve_charset(html, charset)
+                return BeautifulSoup(html, self.parse_engine, parse_only=strainer, from_encoding=charset)
             
-            logger.error(f"🚫 Все попытки исчерпаны для: {url}")
-            return None
-
+            except ServiceOverloadError:
+                # Пауза выполняется вне лимитера и не занимает слот
+                logger.warning("🚨 Rate limit! Делаем длинную паузу")
+                delay = 60
+            
+            except aiohttp.ClientResponseError as e:
+                if e.status == 403:
+                    logger.error("💀 Полный бан! Останавливаемся")
+                    return None
+                elif 400 <= e.status < 500 and e.status != 408:
+                    # Повтор запроса с клиентской ошибкой ничего не изменит
+                    logger.warning(f"❌ {e.status}: {url}")
+                    return None
+                else:
+                    logger.warning(f"🔧 Серверная ошибка {e.status}, пробуем снова...")
+                    delay = self._backoff(attempt)
+            
+            except asyncio.TimeoutError:
+                logger.warning(f"⏰ Таймаут попытка #{attempt}")
+                delay = min(10, 2 ** attempt) + random.uniform(0, 1)
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка: {type(e).__name__}")
+                delay = self._backoff(attempt)
+        
+        logger.error(f"🚫 Все попытки исчерпаны для: {url}")
+        return None
+    
+    async def _fetch_once(self, url: str, *args, **kwargs) -> BeautifulSoup | tuple[bytes, str] | object | None:
+        """
+        Как _fetch, но не загружает повторно страницу, уже отмеченную в _seen.
+        
+        Страница отмечается на время загрузки, чтобы параллельные запросы её не дублировали,
+        и остаётся отмеченной только после успешной загрузки.
+        
+        Returns:
+            Результат _fetch или ALREADY_FETCHED, если страница уже загружалась
+        """
+        params = kwargs.get('params')
+        key = f"{url}?{urlencode(params)}" if params else url
+        if key in self._seen:
+            logger.debug("Страница уже загружалась: {}", key)
+            return ALREADY_FETCHED
+        
+        self._seen.add(key)
+        result = await self._fetch(url, *args, **kwargs)
+        if result is None:
+            # Неудачную загрузку можно повторить по следующей ссылке на страницу
+            self._seen.discard(key)
+        return result
+    
+    def _backoff(self, attempt: int) -> float:
+        """Экспоненциальная пауза со случайным разбросом перед попыткой attempt + 1."""
+        return self.sleep_time * (2 ** attempt) + random.uniform(1, 5)
+    
     def _get_headers(self):
-        headers = self.headers.generate()
-        headers['Referer'] = self._base_url
-        headers['Accept'] = 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-        return headers
- 
\ No newline at end of file
+        return self._hdr_pool[random.getrandbits(4)]
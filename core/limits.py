@@ -0,0 +1,143 @@
+import asyncio
+import math
+import time
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from loguru import logger
+
+
+class ServiceOverloadError(Exception):
+    """Сервер сообщил о перегрузке (429/503)."""
+    
+    def __init__(self, status: int):
+        super().__init__(f"Сервер перегружен, код {status}")
+        self.status = status
+
+
+class AdaptiveLimiter:
+    """
+    Адаптивный ограничитель одновременных запросов в стиле TCP Vegas.
+    
+    Лимит растёт, пока время ответа близко к минимальному наблюдаемому,
+    уменьшается при росте задержки и сокращается вдвое, если сервер
+    ответил перегрузкой (ServiceOverloadError).
+    
+    Attributes:
+        limit: Текущее число разрешённых одновременных запросов
+        min_limit: Нижняя граница лимита
+        max_limit: Верхняя граница лимита
+    """
+    
+    def __init__(
+        self,
+        initial_limit: int,
+        *,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        alpha: int = 2,
+        beta: int = 4
+    ):
+        """
+        Args:
+            initial_limit: Начальный лимит одновременных запросов
+            min_limit: Нижняя граница лимита
+            max_limit: Верхняя граница лимита (по умолчанию 2 * initial_limit)
+            alpha: Оценка очереди, ниже которой лимит увеличивается
+            beta: Оценка очереди, выше которой лимит уменьшается
+        """
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit or initial_limit * 2
+        self.alpha = alpha
+        self.beta = beta
+        
+        self._in_flight = 0
+        self._min_rtt: Optional[float] = None
+        self._condition = asyncio.Condition()
+    
+    @asynccontextmanager
+    async def use(self) -> AsyncIterator[None]:
+        """
+        Занимает слот на время одного запроса.
+        
+        Raises:
+            ServiceOverloadError: Пробрасывается дальше после уменьшения лимита
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        
+        started = time.monotonic()
+        try:
+            yield
+        except ServiceOverloadError:
+            self._on_overload()
+            raise
+        else:
+            self._on_success(time.monotonic() - started)
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+    
+    def _on_success(self, rtt: float) -> None:
+        rtt = max(rtt, 1e-6)
+        if self._min_rtt is None or rtt < self._min_rtt:
+            self._min_rtt = rtt
+        
+        # Оценка числа запросов, "застрявших" в очереди на стороне сервера
+        queue = self.limit * (1 - self._min_rtt / rtt)
+        if queue < self.alpha and self.limit < self.max_limit:
+            self.limit += 1
+        elif queue > self.beta and self.limit > self.min_limit:
+            self.limit -= 1
+    
+    def _on_overload(self) -> None:
+        self.limit = max(self.min_limit, self.limit // 2)
+        logger.warning(f"Сервер перегружен, лимит запросов снижен до {self.limit}")
+
+
+class TokenBucket:
+    """
+    Асинхронный token bucket для ограничения частоты запросов.
+    
+    Токены пополняются со скоростью rate в секунду, но не сверх capacity,
+    поэтому допускается короткий всплеск до capacity запросов, а в среднем
+    частота не превышает rate.
+    
+    Attributes:
+        rate: Скорость пополнения (токенов в секунду)
+        capacity: Максимальный запас токенов
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, tokens: float = 1) -> None:
+        """
+        Ожидает, пока в корзине наберётся нужное число токенов, и забирает их.
+        
+        Args:
+            tokens: Количество токенов для одного запроса
+        """
+        if math.isinf(self.rate):
+            return
+        
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
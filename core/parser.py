@@ -1,11 +1,72 @@
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, List
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
+import lxml.html
+import soupsieve as sv
+from bs4 import BeautifulSoup, Tag
 from loguru import logger
+from lxml import etree
+from selectolax.lexbor import LexborHTMLParser
 
-from core.base import BaseParser
+from core.base import BaseParser, TagStrainer, lxml_parser
 from tools import get_integer
 
+# Заглушка, если у продукта нет ни одного изображения
+_DEFAULT_POSTER = "https://digis.ru/bitrix_personal/templates/ia_pegas_digis/images/tmp/42_282.jpg"
+
+# Предкомпилированные CSS-селекторы для ConcreteDigisParser
+_SEL_TITLE = sv.compile('h1')
+_SEL_DESC = sv.compile('div.prod-detail-head-desc')
+_SEL_FULL = sv.compile('#tab_description')
+_SEL_PROPS = sv.compile('div.prod-detail-box-buy-head .list-props')
+_SEL_PRICE = sv.compile('div.price')
+_SEL_PRICE_LI = sv.compile('li')
+_SEL_VAL = sv.compile('.val')
+_SEL_CURRENCY = sv.compile('.currency')
+_SEL_GALLERY = sv.compile('#prod-gallery .swiper-slide')
+_SEL_GALLERY_FALLBACK = sv.compile('.prod-detail-img img')
+_SEL_FEATURES = sv.compile('#tab_features tr')
+_SEL_SPEC = sv.compile('#tab_specification tr')
+_SEL_DOC = sv.compile('#tab_documentation tr')
+_SEL_DOC_LINK = sv.compile('.td-btn a')
+_SEL_ACC = sv.compile('#tab_accessories tr')
+_SEL_ACC_LINK = sv.compile('.col-body a')
+
+# Предкомпилированные XPath-выражения для LxmlDigisParser
+def _has_class(name: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+_XP_TITLE = etree.XPath('//h1')
+_XP_DESC = etree.XPath(f'//div[{_has_class("prod-detail-head-desc")}]')
+_XP_FULL = etree.XPath('//*[@id="tab_description"]')
+_XP_PROPS = etree.XPath(f'//div[{_has_class("prod-detail-box-buy-head")}]//*[{_has_class("list-props")}]')
+_XP_PRICE = etree.XPath(f'//div[{_has_class("price")}]')
+_XP_PRICE_LI = etree.XPath('.//li')
+_XP_VAL = etree.XPath(f'.//*[{_has_class("val")}]')
+_XP_CURRENCY = etree.XPath(f'.//*[{_has_class("currency")}]')
+_XP_GALLERY = etree.XPath(f'//*[@id="prod-gallery"]//*[{_has_class("swiper-slide")}]')
+_XP_GALLERY_FALLBACK = etree.XPath(f'//*[{_has_class("prod-detail-img")}]//img')
+_XP_LINK = etree.XPath('.//a')
+_XP_IMG = etree.XPath('.//img')
+_XP_CELLS = etree.XPath('./th|./td')
+_XP_FEATURES = etree.XPath('//*[@id="tab_features"]//tr')
+_XP_SPEC = etree.XPath('//*[@id="tab_specification"]//tr')
+_XP_DOC = etree.XPath('//*[@id="tab_documentation"]//tr')
+_XP_DOC_LINK = etree.XPath(f'.//*[{_has_class("td-btn")}]//a')
+_XP_ACC = etree.XPath('//*[@id="tab_accessories"]//tr')
+_XP_ACC_LINK = etree.XPath(f'.//*[{_has_class("col-body")}]//a')
+
+# Блоки страницы продукта, которые читают экстракторы ConcreteDigisParser
+_PRODUCT_STRAINER = TagStrainer(
+    names=('h1',),
+    ids=(
+        'tab_description', 'tab_features', 'tab_specification',
+        'tab_documentation', 'tab_accessories', 'prod-gallery',
+    ),
+    classes=('prod-detail-head-desc', 'prod-detail-box-buy-head', 'price', 'prod-detail-img'),
+)
+
 class DigisParser(BaseParser, ABC):
     """
     Абстрактный парсер для извлечения данных о продуктах с сайта Digis.
@@ -24,10 +85,10 @@ class DigisParser(BaseParser, ABC):
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+        
         Returns:
             Заголовок продукта
-            
+        
         Raises:
             AttributeError: Если заголовок не найден
         """
@@ -40,11 +101,11 @@ class DigisParser(BaseParser, ABC):
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+        
         Returns:
             Краткое описание продукта
         """
-        
+    
     @abstractmethod
     def _extract_full_description(self, soup: BeautifulSoup) -> str:
         """
@@ -52,35 +113,50 @@ class DigisParser(BaseParser, ABC):
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+        
         Returns:
             Краткое описание продукта
         """
     
     @abstractmethod
-    def _extract_digis_code(self, soup: BeautifulSoup) -> int:
+    def _extract_sku(self, soup: BeautifulSoup) -> Dict[str, str]:
+        """
+        Извлекает блок идентификаторов продукта (код Digis, артикул).
+        
+        Args:
+            soup: BeautifulSoup объект страницы продукта
+        
+        Returns:
+            Словарь идентификаторов в формате {название: значение}
+        """
+        pass
+    
+    @abstractmethod
+    def _extract_digis_code(self, soup: BeautifulSoup, sku: Dict[str, str]) -> int:
         """
         Извлекает код Digis продукта.
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+            sku: Результат _extract_sku для этой страницы
+        
         Returns:
             Код Digis продукта
-            
+        
         Raises:
             ValueError: Если код не может быть преобразован в число
         """
         pass
     
     @abstractmethod
-    def _extract_article(self, soup: BeautifulSoup) -> str:
+    def _extract_article(self, soup: BeautifulSoup, sku: Dict[str, str]) -> str:
         """
         Извлекает артикул продукта.
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+            sku: Результат _extract_sku для этой страницы
+        
         Returns:
             Артикул продукта
         """
@@ -93,7 +169,7 @@ class DigisParser(BaseParser, ABC):
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+        
         Returns:
             Строка с ценой продукта
         """
@@ -106,7 +182,7 @@ class DigisParser(BaseParser, ABC):
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+        
         Returns:
             URL изображения продукта
         """
@@ -119,7 +195,7 @@ class DigisParser(BaseParser, ABC):
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+        
         Returns:
             Словарь характеристик в формате {название: значение}
         """
@@ -132,7 +208,7 @@ class DigisParser(BaseParser, ABC):
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+        
         Returns:
             Словарь спецификаций в формате {название: значение}
         """
@@ -145,7 +221,7 @@ class DigisParser(BaseParser, ABC):
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+        
         Returns:
             Словарь документации в формате {название_документа: URL}
         """
@@ -158,40 +234,68 @@ class DigisParser(BaseParser, ABC):
         
         Args:
             soup: BeautifulSoup объект страницы продукта
-            
+        
         Returns:
             Список названий аксессуаров
         """
         pass
     
+    async def _fetch_tree(self, url: str) -> Optional[BeautifulSoup]:
+        """
+        Загружает страницу продукта и строит дерево для экстракторов.
+        
+        Args:
+            url: URL страницы продукта
+        
+        Returns:
+            Дерево страницы или None при ошибке загрузки
+        """
+        return await self._fetch(url)
+    
+    def _release_tree(self, tree) -> None:
+        """
+        Освобождает дерево страницы после извлечения данных.
+        
+        Дерево BeautifulSoup состоит из циклических ссылок (parent/children)
+        и без decompose() живёт до прохода сборщика мусора. Деревья lxml
+        и selectolax освобождаются сразу по счётчику ссылок.
+        
+        Args:
+            tree: Дерево, полученное из _fetch_tree
+        """
+        if isinstance(tree, BeautifulSoup):
+            tree.decompose()
+    
     async def parse_product(self, url: str) -> Optional[Dict[str, str]]:
         """
         Парсит данные продукта по указанному URL.
         
         Args:
             url: URL страницы продукта
-            
+        
         Returns:
             Словарь с данными продукта или None при ошибке
-            
+        
         Examples:
             >>> parser = ConcreteDigisParser(session, "https://example.com")
             >>> product_data = await parser.parse_product("https://digis.ru/product/123")
             >>> print(product_data['title'])
             "Смартфон Apple iPhone 15 Pro"
         """
+        soup = None
         try:
-            soup = await self._fetch(url)
-            if not soup:
+            soup = await self._fetch_tree(url)
+            if soup is None:
                 logger.error(f"Не удалось загрузить страницу продукта: {url}")
                 return None
             
+            sku = self._extract_sku(soup)
             product_data = {
                 'title': self._extract_title(soup),
                 'short_description': self._extract_description(soup),
                 'full_description': self._extract_full_description(soup),
-                'code_digis': self._extract_digis_code(soup),
-                'article': self._extract_article(soup),
+                'code_digis': self._extract_digis_code(soup, sku),
+                'article': self._extract_article(soup, sku),
                 'price': self._extract_price(soup),
                 'poster': self._extract_poster(soup),
                 'characteristics': self._extract_characteristics(soup),
@@ -202,10 +306,15 @@ class DigisParser(BaseParser, ABC):
             
             logger.info(f"Успешно распарсен продукт: {product_data['title']}")
             return product_data
-            
+        
         except Exception as e:
             logger.error(f"Ошибка при парсинге продукта {url}: {e}")
             return None
+        
+        finally:
+            # Данные уже скопированы в словарь, дерево страницы больше не нужно
+            if soup is not None:
+                self._release_tree(soup)
 
 class ConcreteDigisParser(DigisParser):
     """
@@ -215,12 +324,17 @@ class ConcreteDigisParser(DigisParser):
     со специфичной для Digis структурой HTML.
     """
     
+    async def _fetch_tree(self, url: str) -> Optional[BeautifulSoup]:
+        return await self._fetch(url, strainer=_PRODUCT_STRAINER)
+    
+    def _row_cells(self, tr: Tag) -> List[str]:
+        """Текст ячеек строки таблицы (только прямые потомки th/td)."""
+        return [cell.get_text(' ', strip=True) for cell in tr.find_all(('th', 'td'), recursive=False)]
+    
     def _extract_title(self, soup: BeautifulSoup) -> str:
         """Реализация извлечения заголовка для Digis."""
-        logger.debug("Попытка извлечь title")
         try:
-            title_element = soup.select_one('h1')
-            logger.debug(f"Найден element: {title_element}")
+            title_element = _SEL_TITLE.select_one(soup)
             return title_element.get_text(strip=True) if title_element else "Неизвестный товар"
         except Exception as e:
             logger.warning(f"Ошибка извлечения заголовка: {e}")
@@ -228,10 +342,8 @@ class ConcreteDigisParser(DigisParser):
     
     def _extract_description(self, soup: BeautifulSoup) -> str:
         """Реализация извлечения описания для Digis."""
-        logger.debug("Попытка извлечь description")
         try:
-            desc_element = soup.select_one('div.prod-detail-head-desc')
-            logger.debug("Описание найдено" if desc_element else "Описание не обнаружено")
+            desc_element = _SEL_DESC.select_one(soup)
             return desc_element.get_text(strip=True) if desc_element else ""
         except Exception as e:
             logger.warning(f"Ошибка извлечения описания: {e}")
@@ -239,40 +351,36 @@ class ConcreteDigisParser(DigisParser):
     
     def _extract_full_description(self, soup):
         """Реализация извлечения полного описания для Digis."""
-        logger.debug("Попытка извлечь full_description")
         try:
-            description = soup.select_one("#tab_description").get_text(separator=' ', strip=True) if soup.select_one("#tab_description") else ""
-            return description
+            description = _SEL_FULL.select_one(soup)
+            return description.get_text(separator=' ', strip=True) if description else ""
         except Exception as e:
             logger.warning(f"Ошибка извлечения полного описания: {e}")
             return ""
-            
     
-    def _extract_digis_code(self, soup: BeautifulSoup) -> int:
+    
+    def _extract_digis_code(self, soup: BeautifulSoup, sku: Dict[str, str]) -> int:
         """Реализация извлечения кода Digis."""
-        logger.debug("Попытка извлечь артикул")
         try:
-            result = self._extract_sku(soup).get('Код DIGIS', "")
-            logger.debug(f"Удалось извлечь артикул: {result}" if result else "Не удалось извалечь артикул")
+            result = sku.get('Код DIGIS', "")
             return get_integer(result)
         except Exception as e:
             logger.warning(f"Ошибка извлечения кода Digis: {e}")
             return 0
     
-    def _extract_article(self, soup: BeautifulSoup) -> str:
+    def _extract_article(self, soup: BeautifulSoup, sku: Dict[str, str]) -> str:
         """Реализация извлечения артикула."""
-        logger.debug("Попытка извлечь артикул")
         try:
-            result = self._extract_sku(soup).get('Артикул', "")
-            logger.debug(f"Удалось извлечь артикул: {result}" if result else "Не удалось извалечь артикул")
+            result = sku.get('Артикул', "")
             return result
         except Exception as e:
             logger.warning(f"Ошибка извлечения артикула: {e}")
             return ""
     
-    def _extract_sku(self, soup: BeautifulSoup) -> dict[str, str]: 
+    def _extract_sku(self, soup: BeautifulSoup) -> dict[str, str]:
+        """Реализация извлечения идентификаторов продукта."""
         result = {}
-        props = soup.select_one("div.prod-detail-box-buy-head .list-props")
+        props = _SEL_PROPS.select_one(soup)
         if not props:
             logger.warning("Не найден ни один обозначающий идентификатор")
             return result
@@ -281,30 +389,31 @@ class ConcreteDigisParser(DigisParser):
             values = li.get_text(strip=True).split(":")
             if len(values) != 2:
                 logger.warning(f"Обнаруже неизваестный атрибут: {values}")
+                continue
             
             key, value = values
             result[key] = value
         return result
-        
+    
     def _extract_price(self, soup: BeautifulSoup) -> str:
         """Реализация извлечения цены."""
         try:
             price = {}
-            price_element = soup.select_one('div.price')
+            price_element = _SEL_PRICE.select_one(soup)
             if not price_element:
                 logger.info("Не найдена цена")
                 return "0"
             
-            current_value = price_element.select_one('.val')
-            current_currency = price_element.select_one('.currency')
+            current_value = _SEL_VAL.select_one(price_element)
+            current_currency = _SEL_CURRENCY.select_one(price_element)
             if not current_value or not current_currency:
                 logger.warning("Остутсвует важный атрибут")
             else:
                 price[current_currency.get_text(strip=True)] = current_value.get_text(strip=True)
-                
-            for li in price_element.select('li'):
-                value = li.select_one('.val')
-                currency = li.select_one('.currency')
+            
+            for li in _SEL_PRICE_LI.select(price_element):
+                value = _SEL_VAL.select_one(li)
+                currency = _SEL_CURRENCY.select_one(li)
                 if not value or not currency:
                     logger.warning("Остутсвует атрибут")
                     continue
@@ -320,37 +429,33 @@ class ConcreteDigisParser(DigisParser):
         """Реализация извлечения постера."""
         try:
             urls = []
-            poster_element = soup.select('#prod-gallery .swiper-slide')
-            for poster in poster_element:
-                if not poster.a and not poster.img:
-                    continue
-                try:
-                    urls.append(self._safe_extract_url(poster.a, 'href'))
-                except Exception:
-                    urls.append(self._safe_extract_url(poster.img, 'src'))
+            for poster in _SEL_GALLERY.select(soup):
+                link = poster.find('a')
+                img = poster.find('img')
+                src = (link and link.get('href')) or (img and img.get('src'))
+                if src:
+                    urls.append(urljoin(self._base_url, src))
             
-            if urls:
-                return urls
-
-            else:
-                for poster in soup.select(".prod-detail-img img"):
-                    urls.append(self._safe_extract_url(poster, 'src'))
-                
-                if not urls:
-                    return ["https://digis.ru/bitrix_personal/templates/ia_pegas_digis/images/tmp/42_282.jpg"]
-                
+            if not urls:
+                for poster in _SEL_GALLERY_FALLBACK.select(soup):
+                    if src := poster.get('src'):
+                        urls.append(urljoin(self._base_url, src))
+            
+            if not urls:
+                logger.warning("Не найдено ни одного изображения")
+                return [_DEFAULT_POSTER]
             return urls
-                
+        
         except Exception as e:
             logger.warning(f"Ошибка извлечения постера: {e}")
-            return ["https://digis.ru/bitrix_personal/templates/ia_pegas_digis/images/tmp/42_282.jpg"]
+            return [_DEFAULT_POSTER]
     
     def _extract_characteristics(self, soup: BeautifulSoup) -> Dict[str, str]:
         """Реализация извлечения характеристик."""
         try:
             characteristics = {}
-            for tr in soup.select('#tab_features tr'):
-                values = list(tr._all_strings(strip=True))
+            for tr in _SEL_FEATURES.select(soup):
+                values = self._row_cells(tr)
                 if len(values) != 2:
                     logger.warning("Неподдерживаемый тип харектеристик")
                     continue
@@ -365,9 +470,9 @@ class ConcreteDigisParser(DigisParser):
         """Реализация извлечения спецификаций."""
         try:
             specification = {}
-            spec_elements = soup.select('#tab_specification tr')
+            spec_elements = _SEL_SPEC.select(soup)
             for tr in spec_elements:
-                values = list(tr._all_strings(strip=True))
+                values = self._row_cells(tr)
                 if len(values) != 2:
                     continue
                 
@@ -382,9 +487,9 @@ class ConcreteDigisParser(DigisParser):
         """Реализация извлечения документации."""
         try:
             documentation = []
-            doc_elements = soup.select('#tab_documentation tr')
+            doc_elements = _SEL_DOC.select(soup)
             for element in doc_elements:
-                doc_url = element.select_one('.td-btn a')
+                doc_url = _SEL_DOC_LINK.select_one(element)
                 if not doc_url:
                     logger.warning("Пустое значение")
                     continue
@@ -398,12 +503,441 @@ class ConcreteDigisParser(DigisParser):
         """Реализация извлечения аксессуаров."""
         try:
             accessories = []
-            accessory_elements = soup.select('#tab_accessories tr')
+            accessory_elements = _SEL_ACC.select(soup)
             for element in accessory_elements:
-                name = element.select_one('.col-body a')
+                name = _SEL_ACC_LINK.select_one(element)
+                if name:
+                    accessories.append(self._safe_extract_url(name, 'href'))
+            return accessories
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения аксессуаров: {e}")
+            return []
+
+
+class SelectolaxDigisParser(DigisParser):
+    """
+    Реализация парсера Digis на selectolax (движок Lexbor).
+    
+    Извлекает те же данные, что и ConcreteDigisParser, но строит
+    дерево через LexborHTMLParser, который выполняет CSS-выборки
+    значительно быстрее BeautifulSoup.
+    """
+    
+    async def _fetch_tree(self, url: str) -> Optional[LexborHTMLParser]:
+        fetched = await self._fetch(url, raw=True)
+        if not fetched:
+            return None
+        html, charset = fetched
+        # Lexbor считает байты UTF-8, поэтому страницы в другой кодировке декодируем сами
+        return LexborHTMLParser(html.decode(charset, errors='replace'))
+    
+    def _node_url(self, node, attr: str) -> Optional[str]:
+        """Возвращает абсолютный URL из атрибута узла."""
+        if node is not None and (url := node.attributes.get(attr)):
+            return urljoin(self._base_url, url)
+        logger.warning("Не удалось получить URL")
+        return None
+    
+    def _node_strings(self, node) -> List[str]:
+        """Аналог bs4 `_all_strings(strip=True)` для узла selectolax."""
+        return [text for text in node.text(separator='\n', strip=True).split('\n') if text]
+    
+    def _row_cells(self, tr) -> List[str]:
+        """Текст ячеек строки таблицы (только прямые потомки th/td)."""
+        return [' '.join(self._node_strings(cell)) for cell in tr.iter() if cell.tag in ('th', 'td')]
+    
+    def _extract_title(self, tree: LexborHTMLParser) -> str:
+        """Реализация извлечения заголовка для Digis."""
+        try:
+            title_element = tree.css_first('h1')
+            return title_element.text(strip=True) if title_element else "Неизвестный товар"
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения заголовка: {e}")
+            return "Неизвестный товар"
+    
+    def _extract_description(self, tree: LexborHTMLParser) -> str:
+        """Реализация извлечения описания для Digis."""
+        try:
+            desc_element = tree.css_first('div.prod-detail-head-desc')
+            return desc_element.text(strip=True) if desc_element else ""
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения описания: {e}")
+            return ""
+    
+    def _extract_full_description(self, tree: LexborHTMLParser) -> str:
+        """Реализация извлечения полного описания для Digis."""
+        try:
+            description = tree.css_first("#tab_description")
+            return description.text(separator=' ', strip=True) if description else ""
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения полного описания: {e}")
+            return ""
+    
+    def _extract_digis_code(self, tree: LexborHTMLParser, sku: Dict[str, str]) -> int:
+        """Реализация извлечения кода Digis."""
+        try:
+            return get_integer(sku.get('Код DIGIS', ""))
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения кода Digis: {e}")
+            return 0
+    
+    def _extract_article(self, tree: LexborHTMLParser, sku: Dict[str, str]) -> str:
+        """Реализация извлечения артикула."""
+        try:
+            return sku.get('Артикул', "")
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения артикула: {e}")
+            return ""
+    
+    def _extract_sku(self, tree: LexborHTMLParser) -> dict[str, str]:
+        """Реализация извлечения идентификаторов продукта."""
+        result = {}
+        props = tree.css_first("div.prod-detail-box-buy-head .list-props")
+        if not props:
+            logger.warning("Не найден ни один обозначающий идентификатор")
+            return result
+        
+        for li in props.iter():
+            if li.tag != 'li':
+                continue
+            values = li.text(strip=True).split(":")
+            if len(values) != 2:
+                logger.warning(f"Обнаруже неизваестный атрибут: {values}")
+                continue
+            
+            key, value = values
+            result[key] = value
+        return result
+    
+    def _extract_price(self, tree: LexborHTMLParser) -> str:
+        """Реализация извлечения цены."""
+        try:
+            price = {}
+            price_element = tree.css_first('div.price')
+            if not price_element:
+                logger.info("Не найдена цена")
+                return "0"
+            
+            current_value = price_element.css_first('.val')
+            current_currency = price_element.css_first('.currency')
+            if not current_value or not current_currency:
+                logger.warning("Остутсвует важный атрибут")
+            else:
+                price[current_currency.text(strip=True)] = current_value.text(strip=True)
+            
+            for li in price_element.css('li'):
+                value = li.css_first('.val')
+                currency = li.css_first('.currency')
+                if not value or not currency:
+                    logger.warning("Остутсвует атрибут")
+                    continue
+                price[currency.text(strip=True)] = value.text(strip=True)
+            
+            return (price.get('руб', "0") + ' руб') if 'руб' in price else price.get('USD', "0") + ' USD'
+        
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения цены: {e}")
+            return "0"
+    
+    def _extract_poster(self, tree: LexborHTMLParser) -> list[str]:
+        """Реализация извлечения постера."""
+        try:
+            urls = []
+            for poster in tree.css('#prod-gallery .swiper-slide'):
+                link = poster.css_first('a')
+                img = poster.css_first('img')
+                src = (link and link.attributes.get('href')) or (img and img.attributes.get('src'))
+                if src:
+                    urls.append(urljoin(self._base_url, src))
+            
+            if not urls:
+                for poster in tree.css(".prod-detail-img img"):
+                    if src := poster.attributes.get('src'):
+                        urls.append(urljoin(self._base_url, src))
+            
+            if not urls:
+                logger.warning("Не найдено ни одного изображения")
+                return [_DEFAULT_POSTER]
+            return urls
+        
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения постера: {e}")
+            return [_DEFAULT_POSTER]
+    
+    def _extract_characteristics(self, tree: LexborHTMLParser) -> Dict[str, str]:
+        """Реализация извлечения характеристик."""
+        try:
+            characteristics = {}
+            for tr in tree.css('#tab_features tr'):
+                values = self._row_cells(tr)
+                if len(values) != 2:
+                    logger.warning("Неподдерживаемый тип харектеристик")
+                    continue
+                key, value = values
+                characteristics[key] = value
+            return characteristics
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения характеристик: {e}")
+            return {}
+    
+    def _extract_specification(self, tree: LexborHTMLParser) -> Dict[str, str]:
+        """Реализация извлечения спецификаций."""
+        try:
+            specification = {}
+            for tr in tree.css('#tab_specification tr'):
+                values = self._row_cells(tr)
+                if len(values) != 2:
+                    continue
+                
+                key, value = values
+                specification[key] = value
+            return specification
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения спецификаций: {e}")
+            return {}
+    
+    def _extract_documentation(self, tree: LexborHTMLParser) -> List[str]:
+        """Реализация извлечения документации."""
+        try:
+            documentation = []
+            for element in tree.css('#tab_documentation tr'):
+                doc_url = element.css_first('.td-btn a')
+                if not doc_url:
+                    logger.warning("Пустое значение")
+                    continue
+                documentation.append(self._node_url(doc_url, 'href'))
+            return documentation
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения документации: {e}")
+            return []
+    
+    def _extract_accessories(self, tree: LexborHTMLParser) -> List[str]:
+        """Реализация извлечения аксессуаров."""
+        try:
+            accessories = []
+            for element in tree.css('#tab_accessories tr'):
+                name = element.css_first('.col-body a')
                 if name:
+                    accessories.append(self._node_url(name, 'href'))
+            return accessories
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения аксессуаров: {e}")
+            return []
+
+
+
+class LxmlDigisParser(DigisParser):
+    """
+    Реализация парсера Digis на lxml.html с предкомпилированными XPath.
+    
+    Дерево строится напрямую из байтов ответа, без объектной модели
+    BeautifulSoup, а все выражения компилируются один раз при импорте.
+    """
+    
+    async def _fetch_tree(self, url: str) -> Optional[lxml.html.HtmlElement]:
+        fetched = await self._fetch(url, raw=True)
+        if not fetched:
+            return None
+        html, charset = fetched
+        # Без явной кодировки libxml2 читает страницу без <meta charset> как latin-1
+        return lxml.html.document_fromstring(html, parser=lxml_parser(charset))
+    
+    def _first(self, xpath: etree.XPath, element):
+        """Возвращает первый найденный элемент или None."""
+        found = xpath(element)
+        return found[0] if found else None
+    
+    def _text(self, element, separator: str = '') -> str:
+        """Аналог bs4 `get_text(separator, strip=True)` для элемента lxml."""
+        return separator.join(self._strings(element))
+    
+    def _strings(self, element) -> List[str]:
+        """Аналог bs4 `_all_strings(strip=True)` для элемента lxml."""
+        return [text for text in (part.strip() for part in element.itertext()) if text]
+    
+    def _row_cells(self, tr) -> List[str]:
+        """Текст ячеек строки таблицы (только прямые потомки th/td)."""
+        return [self._text(cell, ' ') for cell in _XP_CELLS(tr)]
+    
+    def _extract_title(self, tree: lxml.html.HtmlElement) -> str:
+        """Реализация извлечения заголовка для Digis."""
+        try:
+            title_element = self._first(_XP_TITLE, tree)
+            return self._text(title_element) if title_element is not None else "Неизвестный товар"
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения заголовка: {e}")
+            return "Неизвестный товар"
+    
+    def _extract_description(self, tree: lxml.html.HtmlElement) -> str:
+        """Реализация извлечения описания для Digis."""
+        try:
+            desc_element = self._first(_XP_DESC, tree)
+            return self._text(desc_element) if desc_element is not None else ""
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения описания: {e}")
+            return ""
+    
+    def _extract_full_description(self, tree: lxml.html.HtmlElement) -> str:
+        """Реализация извлечения полного описания для Digis."""
+        try:
+            description = self._first(_XP_FULL, tree)
+            return self._text(description, ' ') if description is not None else ""
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения полного описания: {e}")
+            return ""
+    
+    def _extract_digis_code(self, tree: lxml.html.HtmlElement, sku: Dict[str, str]) -> int:
+        """Реализация извлечения кода Digis."""
+        try:
+            return get_integer(sku.get('Код DIGIS', ""))
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения кода Digis: {e}")
+            return 0
+    
+    def _extract_article(self, tree: lxml.html.HtmlElement, sku: Dict[str, str]) -> str:
+        """Реализация извлечения артикула."""
+        try:
+            return sku.get('Артикул', "")
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения артикула: {e}")
+            return ""
+    
+    def _extract_sku(self, tree: lxml.html.HtmlElement) -> dict[str, str]:
+        """Реализация извлечения идентификаторов продукта."""
+        result = {}
+        props = self._first(_XP_PROPS, tree)
+        if props is None:
+            logger.warning("Не найден ни один обозначающий идентификатор")
+            return result
+        
+        for li in props.iterchildren('li'):
+            values = self._text(li).split(":")
+            if len(values) != 2:
+                logger.warning(f"Обнаруже неизваестный атрибут: {values}")
+                continue
+            
+            key, value = values
+            result[key] = value
+        return result
+    
+    def _extract_price(self, tree: lxml.html.HtmlElement) -> str:
+        """Реализация извлечения цены."""
+        try:
+            price = {}
+            price_element = self._first(_XP_PRICE, tree)
+            if price_element is None:
+                logger.info("Не найдена цена")
+                return "0"
+            
+            current_value = self._first(_XP_VAL, price_element)
+            current_currency = self._first(_XP_CURRENCY, price_element)
+            if current_value is None or current_currency is None:
+                logger.warning("Остутсвует важный атрибут")
+            else:
+                price[self._text(current_currency)] = self._text(current_value)
+            
+            for li in _XP_PRICE_LI(price_element):
+                value = self._first(_XP_VAL, li)
+                currency = self._first(_XP_CURRENCY, li)
+                if value is None or currency is None:
+                    logger.warning("Остутсвует атрибут")
+                    continue
+                price[self._text(currency)] = self._text(value)
+            
+            return (price.get('руб', "0") + ' руб') if 'руб' in price else price.get('USD', "0") + ' USD'
+        
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения цены: {e}")
+            return "0"
+    
+    def _extract_poster(self, tree: lxml.html.HtmlElement) -> list[str]:
+        """Реализация извлечения постера."""
+        try:
+            urls = []
+            for poster in _XP_GALLERY(tree):
+                link = self._first(_XP_LINK, poster)
+                img = self._first(_XP_IMG, poster)
+                src = (link is not None and link.get('href')) or (img is not None and img.get('src'))
+                if src:
+                    urls.append(urljoin(self._base_url, src))
+            
+            if not urls:
+                for poster in _XP_GALLERY_FALLBACK(tree):
+                    if src := poster.get('src'):
+                        urls.append(urljoin(self._base_url, src))
+            
+            if not urls:
+                logger.warning("Не найдено ни одного изображения")
+                return [_DEFAULT_POSTER]
+            return urls
+        
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения постера: {e}")
+            return [_DEFAULT_POSTER]
+    
+    def _extract_characteristics(self, tree: lxml.html.HtmlElement) -> Dict[str, str]:
+        """Реализация извлечения характеристик."""
+        try:
+            characteristics = {}
+            for tr in _XP_FEATURES(tree):
+                values = self._row_cells(tr)
+                if len(values) != 2:
+                    logger.warning("Неподдерживаемый тип харектеристик")
+                    continue
+                key, value = values
+                characteristics[key] = value
+            return characteristics
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения характеристик: {e}")
+            return {}
+    
+    def _extract_specification(self, tree: lxml.html.HtmlElement) -> Dict[str, str]:
+        """Реализация извлечения спецификаций."""
+        try:
+            specification = {}
+            for tr in _XP_SPEC(tree):
+                values = self._row_cells(tr)
+                if len(values) != 2:
+                    continue
+                
+                key, value = values
+                specification[key] = value
+            return specification
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения спецификаций: {e}")
+            return {}
+    
+    def _extract_documentation(self, tree: lxml.html.HtmlElement) -> List[str]:
+        """Реализация извлечения документации."""
+        try:
+            documentation = []
+            for element in _XP_DOC(tree):
+                doc_url = self._first(_XP_DOC_LINK, element)
+                if doc_url is None:
+                    logger.warning("Пустое значение")
+                    continue
+                documentation.append(self._safe_extract_url(doc_url, 'href'))
+            return documentation
+        except Exception as e:
+            logger.warning(f"Ошибка извлечения документации: {e}")
+            return []
+    
+    def _extract_accessories(self, tree: lxml.html.HtmlElement) -> List[str]:
+        """Реализация извлечения аксессуаров."""
+        try:
+            accessories = []
+            for element in _XP_ACC(tree):
+                name = self._first(_XP_ACC_LINK, element)
+                if name is not None:
                     accessories.append(self._safe_extract_url(name, 'href'))
             return accessories
         except Exception as e:
             logger.warning(f"Ошибка извлечения аксессуаров: {e}")
-            return []
\ No newline at end of file
+            return []
+
+# Реализации парсера продукта, доступные через DigisAPI(backend=...)
+PARSER_BACKENDS: Dict[str, type[DigisParser]] = {
+    'bs4': ConcreteDigisParser,
+    'selectolax': SelectolaxDigisParser,
+    'lxml': LxmlDigisParser,
+}
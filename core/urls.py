@@ -1,27 +1,49 @@
 import asyncio
 import sys
 
-import aiohttp
+from typing import Optional
+
 import pandas as pd
+import soupsieve as sv
 from bs4 import BeautifulSoup
 
 from loguru import logger
 from loguru._defaults import LOGURU_FORMAT
-from .base import BaseParser
+from .base import ALREADY_FETCHED, BaseParser, TagStrainer, create_session
+
 
-logger.remove()
-logger.add(
-    'logs.log',
-    format = LOGURU_FORMAT.replace(".SSS", ''),
-    level="INFO",
-    rotation="10 MB"
-)
-logger.add(
-    sys.stdout,
-    format = LOGURU_FORMAT.replace(".SSS", ''),
-    level="ERROR"
-)
+def setup_logging() -> None:
+    """
+    Настраивает вывод логов: INFO и выше в logs.log, ошибки в stdout.
     
+    Вызывается из точек входа, а не при импорте модуля, чтобы импорт
+    (например, в тестах) не создавал logs.log в текущей директории.
+    """
+    logger.remove()
+    logger.add(
+        'logs.log',
+        format = LOGURU_FORMAT.replace(".SSS", ''),
+        level="INFO",
+        rotation="10 MB"
+    )
+    logger.add(
+        sys.stdout,
+        format = LOGURU_FORMAT.replace(".SSS", ''),
+        level="ERROR"
+    )
+
+
+_SEL_RUBRICS = sv.compile("#main-rubrics .lvl-1")
+_SEL_RUBRIC_TITLE = sv.compile(".ttl")
+_SEL_CANONICAL = sv.compile('link[rel="canonical"]')
+_SEL_SUBRUBRICS = sv.compile(".rubric-list.row.flex.flex-wrap a")
+_SEL_PRODUCTS = sv.compile(".list-prods tbody tr")
+_SEL_PAGER = sv.compile(".pager-pages-list.line-items")
+
+_DISTRIBUTION_STRAINER = TagStrainer(ids=("main-rubrics",))
+_RUBRIC_STRAINER = TagStrainer(names=("link",), classes=("rubric-list",))
+_PAGINATION_STRAINER = TagStrainer(classes=("list-prods", "pager-pages-list"))
+
 class DigisExractUrls(BaseParser):
     DISTRIBUTION_URL = "https://digis.ru/distribution"
     
@@ -30,39 +52,43 @@ class DigisExractUrls(BaseParser):
         logger.info("Достаём URLS всех обьектов")
         urls_lvl1 = await self._extract_distribution()
         
-        tasks = [asyncio.create_task(self._extrac_level2(url)) for url in urls_lvl1]
-        for task in asyncio.as_completed(tasks):
-            response_urls = await task
-            urls = urls.union(response_urls)
-            
-        return urls
+        tasks = [self._extrac_level2(url) for url in dict.fromkeys(urls_lvl1) if url]
+        for response_urls in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(response_urls, Exception):
+                logger.error(f"Ошибка при обходе категории: {response_urls}")
+                continue
+            urls.update(response_urls)
         
+        return urls
+    
     async def _extract_distribution(self):
         logger.info("Обходим 1 уровень категорий")
-        soup = await self._fetch(self.DISTRIBUTION_URL)
+        soup = await self._fetch(self.DISTRIBUTION_URL, strainer=_DISTRIBUTION_STRAINER)
         if not soup:
             raise ValueError("Не удалось получить обязательный уровень")
         urls = []
         
-        for lvl in soup.select("#main-rubrics .lvl-1"):
-            url = lvl.select_one('.ttl')
+        for lvl in _SEL_RUBRICS.select(soup):
+            url = _SEL_RUBRIC_TITLE.select_one(lvl)
             if not url:
                 logger.warning("Ненайден url в lvl")
                 continue
             
             urls.append(self._safe_extract_url(url, 'href'))
         return urls
-
+    
     async def _extrac_level2(self, url: str) -> list[str]:
         logger.info("Обходим 2 уровень категорий")
-        soup = await self._fetch(url)
+        soup = await self._fetch_once(url, strainer=_RUBRIC_STRAINER)
+        if soup is ALREADY_FETCHED:
+            return []
         if not soup:
             logger.error(f"Не удалось получть данные для: {url}")
             return []
         
-        canonical = soup.select_one('link[rel="canonical"]')
+        canonical = _SEL_CANONICAL.select_one(soup)
         
-        box = soup.select('.rubric-list.row.flex.flex-wrap a')
+        box = _SEL_SUBRUBRICS.select(soup)
         if not box:
             logger.warning(f"Не найден ни одна подкатегория!, URL: {canonical}")
             return []
@@ -73,71 +99,158 @@ class DigisExractUrls(BaseParser):
         return urls
 
 class PaginationDigis(BaseParser):
-    
+
     def _extract_page_urls(self, soup: BeautifulSoup) -> list[str]:
         urls = []
-        tr_s = soup.select(".list-prods tbody tr")
+        tr_s = _SEL_PRODUCTS.select(soup)
         for tr in tr_s:
             if tr.a:
                 urls.append(self._safe_extract_url(tr.a, 'href'))
         return urls
     
-    async def start_parsing_catrgory(self, url: str):
+    async def _collect_page_urls(
+        self,
+        soup: BeautifulSoup,
+        page_urls: set[str],
+        queue: Optional[asyncio.Queue],
+        queued: set[str]
+    ) -> None:
+        """Добавляет новые URL продуктов страницы в page_urls и, если задана, в очередь."""
+        for product_url in self._extract_page_urls(soup):
+            if product_url is None or product_url in page_urls:
+                continue
+            page_urls.add(product_url)
+            # Продукт может встречаться в нескольких категориях, в очередь он попадает один раз
+            if queue is not None and product_url not in queued:
+                queued.add(product_url)
+                await queue.put(product_url)
+    
+    async def _parse_page(
+        self,
+        url: str,
+        page: int,
+        page_urls: set[str],
+        queue: Optional[asyncio.Queue],
+        queued: set[str]
+    ) -> None:
+        soup = await self._fetch_once(url, strainer=_PAGINATION_STRAINER, params = {'PAGEN_1': page})
+        if soup is ALREADY_FETCHED:
+            return
+        if not soup:
+            logger.warning("Не получилось получть данные")
+            return
+        await self._collect_page_urls(soup, page_urls, queue, queued)
+    
+    async def start_parsing_catrgory(
+        self,
+        url: str,
+        queue: Optional[asyncio.Queue] = None,
+        queued: Optional[set[str]] = None
+    ):
+        """
+        Собирает URL продуктов со всех страниц категории.
+        
+        Args:
+            url: URL категории
+            queue: Очередь, в которую URL продуктов кладутся сразу по мере обнаружения
+            queued: URL, уже отправленные в очередь при обходе других категорий
+        
+        Returns:
+            Множество URL продуктов категории
+        """
+        if queued is None:
+            queued = set()
         
-        soup = await self._fetch(url)
+        soup = await self._fetch_once(url, strainer=_PAGINATION_STRAINER)
+        if soup is ALREADY_FETCHED:
+            return set()
         if not soup:
             logger.critical(f"Невозможно получть данные URL: {url}")
             return set()
         
-        page_urls = set(self._extract_page_urls(soup))
-        pages = soup.select_one('.pager-pages-list.line-items')
+        page_urls: set[str] = set()
+        await self._collect_page_urls(soup, page_urls, queue, queued)
+        pages = _SEL_PAGER.select_one(soup)
         
         if not pages:
             return page_urls
-        max_page = max([int(page.get_text(strip=True)) for page in pages.children if page.get_text(strip=True).isdigit()])
-        
-        tasks = [asyncio.create_task(self._fetch(url, params = {'PAGEN_1': page})) for page in range(2, max_page + 1)]
-        async for task in asyncio.as_completed(tasks):
-            soup = await task
-            if not soup:
-                logger.warning("Не получилось получть данные")
-            page_urls = page_urls.union(self._extract_page_urls(soup))
-            
+        page_numbers = (page.get_text(strip=True) for page in pages.children)
+        max_page = max((int(number) for number in page_numbers if number.isdigit()), default=1)
+        
+        tasks = [self._parse_page(url, page, page_urls, queue, queued) for page in range(2, max_page + 1)]
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Ошибка при обработке страницы: {result}")
+        
         logger.success(f"Получено: {len(page_urls)} URLS, и найдено: {max_page} страниц")
         return page_urls
-        
+
 class DigisManager(BaseParser):
-    def __init__(self, session, base_url, parse_engine = 'html.parser', *, max_workers = 5, sleep_time = 3):
-        super().__init__(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time)
-        self._urls_extracter = DigisExractUrls(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time)
-        self._pagination = PaginationDigis(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time)
+    def __init__(self, session, base_url, parse_engine = 'lxml', *, max_workers = 5, sleep_time = 3, limiter = None, bucket = None):
+        super().__init__(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time, limiter=limiter, bucket=bucket)
+        # Загруженные страницы учитываются отдельно для каждого этапа (очищаются в extract_all_urls):
+        # одна ссылка может быть и рубрикой, и категорией с продуктами. limiter и bucket общие
+        self._seen_rubrics: set[str] = set()
+        self._seen_categories: set[str] = set()
+        self._urls_extracter = DigisExractUrls(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time, seen=self._seen_rubrics, limiter=self._limiter, bucket=self._bucket)
+        self._pagination = PaginationDigis(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time, seen=self._seen_categories, limiter=self._limiter, bucket=self._bucket)
+    
+    async def extract_all_urls(self, save: bool = True, queue: Optional[asyncio.Queue] = None):
+        """
+        Собирает URL всех продуктов сайта.
+        
+        Args:
+            save: Сохранить найденные URL в файл
+            queue: Очередь, в которую URL продуктов кладутся по мере обнаружения,
+                чтобы парсинг продуктов начинался до окончания обхода
+        
+        Returns:
+            Множество URL продуктов
+        """
+        # Каждый обход начинается заново; queued - продукты, уже отправленные в очередь
+        self._seen_rubrics.clear()
+        self._seen_categories.clear()
+        queued: set[str] = set()
         
-    async def extract_all_urls(self, save: bool = True):
         product_urls: set[str] = set()
         urls = await self._urls_extracter.start_extract_urls()
         
-        tasks = [
-            asyncio.create_task(self._pagination.start_parsing_catrgory(url)) 
-            for url in urls
-        ]
-        for task in asyncio.as_completed(tasks):
-            response = await task
-            product_urls = product_urls.union(response)
-            
+        tasks = [self._pagination.start_parsing_catrgory(url, queue, queued) for url in urls]
+        for response in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(response, Exception):
+                logger.error(f"Ошибка при обходе пагинации: {response}")
+                continue
+            product_urls.update(response)
+        
         logger.success(f"Обнаружено: {len(product_urls)} продуктов")
         if save:
-            self._save_as_excel(product_urls)
+            self._save_urls(product_urls)
         return product_urls
     
-    def _save_as_excel(self, products: set[str]):
-        df = pd.DataFrame(list(products), columns=['URL'])
-        df.to_excel('links.xlsx', index=False)
+    def _save_urls(self, products: set[str]) -> str:
+        """
+        Сохраняет URL продуктов в links.parquet (если установлен pyarrow) или links.csv.
         
+        Returns:
+            Путь к сохранённому файлу
+        """
+        df = pd.DataFrame(list(products), columns=['URL'])
+        try:
+            df.to_parquet('links.parquet', compression='zstd', index=False)
+            path = 'links.parquet'
+        except ImportError:
+            df.to_csv('links.csv', index=False)
+            path = 'links.csv'
         
+        logger.info(f"URL продуктов сохранены в {path}")
+        return path
+
+
 async def main():
-    async with aiohttp.ClientSession() as session:
+    async with create_session("https://digis.ru", max_workers=5) as session:
         api = DigisManager(session, "https://digis.ru", max_workers = 5, sleep_time=5)
         await api.extract_all_urls()
 
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(main())
\ No newline at end of file
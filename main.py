@@ -1,22 +1,25 @@
 import asyncio
 
-import aiohttp
 from loguru import logger
+from core.base import create_session
+from core.urls import setup_logging
 from service import DigisAPI
 import pandas as pd
 
 async def main():
-    async with aiohttp.ClientSession() as session:
-        api = DigisAPI(session, 'https://digis.ru', sleep_time=5, parse_engine='lxml')
+    async with create_session('https://digis.ru', max_workers=5) as session:
+        api = DigisAPI(session, 'https://digis.ru', max_workers=5, sleep_time=5)
         await api.start_parsing("hear.csv", True, urls_path = "urls/links.xlsx")
         pd.read_csv("hear.csv").to_excel("FullData.xlsx")
 
         
         
 if __name__ == "__main__":
+    setup_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt as e:
         logger.info("Процесс остоновлен пользователем")
     except Exception as e:
-        logger.critical(f"Неизвестная ошибка: {e}")
\ No newline at end of file
+        for error in (e.exceptions if isinstance(e, ExceptionGroup) else (e,)):
+            logger.critical(f"Неизвестная ошибка: {error}")
\ No newline at end of file
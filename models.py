@@ -1,18 +1,39 @@
 import asyncio
 import hashlib
-import json
-from dataclasses import dataclass
-from typing import Optional, Set, Dict, List
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, Dict, List
 from decimal import Decimal, ROUND_HALF_UP
 
+import ahocorasick
 import aiohttp
+import lxml.html
+import orjson
 from loguru import logger
+from lxml import etree
 
-from core.base import BaseParser
+from core.base import BaseParser, lxml_parser
+from core.limits import AdaptiveLimiter, TokenBucket
 from tools import get_num, is_english
 
+# Названия брендов: title у картинок в ul.row, одним проходом по дереву
+_XP_BRAND_TITLES = etree.XPath('//ul[contains(concat(" ", normalize-space(@class), " "), " row ")]//img/@title')
 
-@dataclass(frozen=True)
+
+# Названия колонок as_flat_dict в порядке значений Product.as_csv_row
+_FLAT_FIELDS = (
+    "Название", "Короткое описание", "Полное описание", "Код Digis", "Артикул", "Цена",
+    "Изображение", "Спецификации", "Документация", "Аксессуары", "Бренд"
+)
+
+
+@lru_cache(maxsize=4096)
+def _format_price_cached(price: int) -> str:
+    """Форматирует цену с разделителями разрядов, повторяющиеся цены берутся из кэша."""
+    return f"{price:,}".replace(",", " ") + " ₽"
+
+
+@dataclass(frozen=True, slots=True)
 class Product:
     """Дата-класс для представления товара."""
     title: str
@@ -28,6 +49,15 @@ class Product:
     accessories: List[str]
     brand: str
     
+    # Кэш хэша и отпечатка: продукт неизменяемый, считаем их один раз
+    _hash: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    _fingerprint: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    # Аксессуары в каноническом порядке для сравнения и хэширования
+    _accessories_key: tuple = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        object.__setattr__(self, '_accessories_key', tuple(sorted(self.accessories)))
+    
     def as_dict(self) -> Dict[str, str]:
         return {
             "Название": self.title,
@@ -43,7 +73,7 @@ class Product:
             "Аксессуары": self.accessories,
             "Бренд": self.brand
         }
-
+    
     def as_flat_dict(self) -> Dict[str, str]:
         """
         Преобразует продукт в плоский словарь с русскими названиями полей.
@@ -51,7 +81,7 @@ class Product:
         
         Returns:
             Плоский словарь с строковыми значениями
-            
+        
         Examples:
             >>> product.as_flat_dict()
             {
@@ -61,31 +91,41 @@ class Product:
                 ...
             }
         """
-        return {
-            "Название": self.title,
-            "Короткое описание": self.short_description if self.short_description else "Нет",
-            "Полное описание": self.full_description if self.full_description else "Нет",
-            "Код Digis": str(self.code_digis),
-            "Артикул": self.article,
-            "Цена": self._format_price(self.price),
-            "Изображение": '; '.join(self.posters) ,
-            "Спецификации": self._dict_to_string(self.specification) if self.specification else "Нет",
-            "Документация": '; '.join(self.documentation) if self.documentation else "Нет",
-            "Аксессуары": "; ".join(self.accessories) if self.accessories else "Нет",
-            "Бренд": self.brand
-        }
+        return dict(zip(_FLAT_FIELDS, self.as_csv_row()))
+    
+    def as_csv_row(self) -> List[str]:
+        """
+        Возвращает строку продукта для CSV в порядке _FLAT_FIELDS,
+        без построения промежуточного словаря. Источник значений для as_flat_dict.
         
+        Returns:
+            Список строковых значений
+        """
+        return [
+            self.title,
+            self.short_description if self.short_description else "Нет",
+            self.full_description if self.full_description else "Нет",
+            str(self.code_digis),
+            self.article,
+            self._format_price(self.price),
+            '; '.join(self.posters),
+            self._dict_to_string(self.specification) if self.specification else "Нет",
+            '; '.join(self.documentation) if self.documentation else "Нет",
+            "; ".join(self.accessories) if self.accessories else "Нет",
+            self.brand
+        ]
+    
     def _format_price(self, price: int) -> str:
         """
         Форматирует цену в читаемый вид с разделителями.
         
         Args:
             price: Цена в рублях
-            
+        
         Returns:
             Отформатированная строка цены
         """
-        return f"{price:,}".replace(",", " ") + " ₽"
+        return _format_price_cached(price)
     
     def _dict_to_string(self, dictionary: Dict[str, str]) -> str:
         """
@@ -93,7 +133,7 @@ class Product:
         
         Args:
             dictionary: Словарь для преобразования
-            
+        
         Returns:
             Строковое представление словаря
         """
@@ -104,12 +144,45 @@ class Product:
     
     def __hash__(self) -> int:
         """
-        Эффективное вычисление хэша на основе JSON-сериализации.
+        Хэш по тем же полям, что участвуют в сравнении.
+        
+        Returns:
+            Хэш для использования продукта в множествах и словарях
+        """
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash((
+                self.title,
+                self.short_description,
+                self.code_digis,
+                self.article,
+                self.price,
+                tuple(self.posters),
+                self.brand,
+                tuple(sorted(self.characteristics.items())),
+                tuple(sorted(self.specification.items())),
+                tuple(self.documentation),
+                self._accessories_key
+            )))
+        return self._hash
+    
+    def _sort_dict(self, dictionary: Dict[str, str]) -> Dict[str, str]:
+        """Сортирует словарь по ключам для консистентного хэширования."""
+        return {k: dictionary[k] for k in sorted(dictionary)} if dictionary else {}
+    
+    @property
+    def fingerprint(self) -> str:
+        """
+        Возвращает отпечаток продукта для уникальной идентификации.
+        
+        В отличие от hash() отпечаток не зависит от процесса, поэтому
+        строится на JSON-сериализации с отсортированными данными.
         
         Returns:
-            Уникальный хэш для идентификации продукта
+            SHA256 хэш продукта в виде hex-строки
         """
-        # Создаем словарь с отсортированными данными для консистентности
+        if self._fingerprint is not None:
+            return self._fingerprint
+        
         data_dict = {
             'title': self.title,
             'short_description': self.short_description,
@@ -120,27 +193,29 @@ class Product:
             'brand': self.brand,
             'characteristics': self._sort_dict(self.characteristics),
             'specification': self._sort_dict(self.specification),
-            'documentation': self._sort_dict(self.documentation),
+            'documentation': list(self.documentation),
             'accessories': sorted(self.accessories)
         }
-        json_string = json.dumps(data_dict, sort_keys=True, ensure_ascii=False)
-        
-        sha256_hash = hashlib.sha256(json_string.encode('utf-8'))
-        return int(sha256_hash.hexdigest()[:16], 16)  # Берем первые 16 символов
-    
-    def _sort_dict(self, dictionary: Dict[str, str]) -> Dict[str, str]:
-        """Сортирует словарь по ключам для консистентного хэширования."""
-        return {k: dictionary[k] for k in sorted(dictionary)} if dictionary else {}
+        payload = orjson.dumps(data_dict, option=orjson.OPT_SORT_KEYS)
+        object.__setattr__(self, '_fingerprint', hashlib.sha256(payload).hexdigest())
+        return self._fingerprint
     
     @property
-    def fingerprint(self) -> str:
+    def quick_fingerprint(self) -> Optional[int]:
         """
-        Возвращает отпечаток продукта для уникальной идентификации.
+        Быстрый отпечаток для поиска дублей в пределах одного запуска.
+        
+        Строится встроенным hash() по полям, однозначно задающим
+        предложение (код Digis, артикул, цена), и не стабилен между процессами.
+        Без кода Digis или артикула продукты неразличимы по этим полям,
+        поэтому отпечаток не строится.
         
         Returns:
-            SHA256 хэш продукта в виде hex-строки
+            Целочисленный отпечаток или None
         """
-        return hashlib.sha256(str(hash(self)).encode('utf-8')).hexdigest()
+        if not self.code_digis or not self.article:
+            return None
+        return hash((self.code_digis, self.article, self.price))
     
     def __eq__(self, other: object) -> bool:
         """Проверка равенства по всем полям."""
@@ -152,11 +227,11 @@ class Product:
                 self.code_digis == other.code_digis and
                 self.article == other.article and
                 self.price == other.price and
-                self.poster == other.poster and
+                self.posters == other.posters and
                 self.characteristics == other.characteristics and
                 self.specification == other.specification and
                 self.documentation == other.documentation and
-                sorted(self.accessories) == sorted(other.accessories) and
+                self._accessories_key == other._accessories_key and
                 self.brand == other.brand)
 
 
@@ -180,10 +255,12 @@ class ProductGenerator(BaseParser):
         self,
         session: aiohttp.ClientSession,
         base_url: str,
-        parse_engine: str = 'html.parser',
+        parse_engine: str = 'lxml',
         *,
         max_workers: int = 5,
-        sleep_time: int = 3
+        sleep_time: int = 3,
+        limiter: Optional[AdaptiveLimiter] = None,
+        bucket: Optional[TokenBucket] = None
     ) -> None:
         """
         Инициализация генератора продуктов.
@@ -194,30 +271,51 @@ class ProductGenerator(BaseParser):
             parse_engine: Движок для парсинга HTML
             max_workers: Максимальное количество workers
             sleep_time: Время ожидания между запросами
+            limiter: Общий ограничитель одновременных запросов
+            bucket: Общий ограничитель частоты запросов
         """
-        super().__init__(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time)
-        self._rub_exchange_rate: Optional[Decimal] = None
-        self._brands: Set[str] = set()
+        super().__init__(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time, limiter=limiter, bucket=bucket)
+        # Курс в копейках за доллар, чтобы считать цены в целых числах
+        self._rub_exchange_rate_x100: Optional[int] = None
+        # Бренды в нижнем регистре -> исходное написание
+        self._brands: Dict[str, str] = {}
+        self._brand_automaton: Optional[ahocorasick.Automaton] = None
+        # Кэш бренда по заголовку своего экземпляра, сбрасывается при обновлении брендов
+        self._find_brand = lru_cache(maxsize=8192)(self._find_brand)
     
     async def update_brands(self) -> None:
         """Обновляет список доступных брендов с сайта поставщика."""
         try:
-            soup = await self._fetch(self.SUPPLIERS_URL)
-            if not soup:
+            fetched = await self._fetch(self.SUPPLIERS_URL, raw=True)
+            if not fetched:
                 logger.warning("Не удалось получить данные о брендах")
                 return
-                
-            brands = [
-                img.get('title') for img in soup.select('ul.row img') 
-                if img.get('title')
-            ]
-            self._brands.update(brands)
-            logger.info(f"Обновлено {len(brands)} брендов")
+            html, charset = fetched
             
+            tree = lxml.html.document_fromstring(html, parser=lxml_parser(charset))
+            brands = [str(title) for title in _XP_BRAND_TITLES(tree) if title]
+            for brand in brands:
+                self._brands.setdefault(brand.lower(), brand)
+            self._build_brand_automaton()
+            self._find_brand.cache_clear()
+            logger.info(f"Обновлено {len(brands)} брендов")
+        
         except Exception as e:
             logger.error(f"Ошибка при обновлении брендов: {e}")
             raise
     
+    def _build_brand_automaton(self) -> None:
+        """Строит автомат Ахо-Корасик по названиям брендов в нижнем регистре."""
+        if not self._brands:
+            self._brand_automaton = None
+            return
+        
+        automaton = ahocorasick.Automaton()
+        for brand_lower, brand in self._brands.items():
+            automaton.add_word(brand_lower, brand)
+        automaton.make_automaton()
+        self._brand_automaton = automaton
+    
     async def update_exchange_rate(self) -> None:
         """Обновляет курс доллара к рублю."""
         try:
@@ -239,13 +337,13 @@ class ProductGenerator(BaseParser):
                 
                 rate = data.get('data', {}).get('rate1')
                 if rate:
-                    self._rub_exchange_rate = Decimal(str(rate)).quantize(
-                        Decimal('0.01'), rounding=ROUND_HALF_UP
-                    )
-                    logger.info(f"Обновлен курс доллара: {self._rub_exchange_rate}")
+                    self._rub_exchange_rate_x100 = int((Decimal(str(rate)) * 100).quantize(
+                        Decimal('1'), rounding=ROUND_HALF_UP
+                    ))
+                    logger.info(f"Обновлен курс доллара: {self._rub_exchange_rate_x100 / 100:.2f}")
                 else:
                     logger.warning("Курс доллара не найден в ответе")
-                    
+        
         except aiohttp.ClientError as e:
             logger.error(f"Ошибка сети при получении курса валют: {e}")
         except Exception as e:
@@ -266,10 +364,10 @@ class ProductGenerator(BaseParser):
         
         Args:
             price_str: Строка с ценой
-            
+        
         Returns:
             Цена в рублях в виде целого числа
-            
+        
         Raises:
             ValueError: Если цена не может быть обработана
         """
@@ -280,33 +378,32 @@ class ProductGenerator(BaseParser):
             if self.RUB_SYMBOL in cleaned_price.lower():
                 return price_value
             
-            if self._rub_exchange_rate is None:
+            if self._rub_exchange_rate_x100 is None:
                 logger.warning("Курс доллара не установлен, используется цена как есть")
                 return price_value
-                
-            return int((price_value * self._rub_exchange_rate).quantize(
-                Decimal('1'), rounding=ROUND_HALF_UP
-            ))
             
+            # Округление до рубля по правилу half-up
+            return (price_value * self._rub_exchange_rate_x100 + 50) // 100
+        
         except (ValueError, TypeError) as e:
             logger.error(f"Ошибка обработки цены '{price_str}': {e}")
             raise ValueError(f"Некорректный формат цены: {price_str}") from e
     
-    def _find_brand(self, title: str) -> str:
+    def _find_brand(self, title_lower: str) -> str:
         """
         Находит бренд в заголовке товара.
         
+        Результат кэшируется по заголовку (см. __init__).
+        
         Args:
-            title: Заголовок товара
-            
+            title_lower: Заголовок товара в нижнем регистре
+        
         Returns:
             Найденный бренд или первое английское слово из заголовка
         """
-        title_lower = title.lower()
-        
-        # Поиск среди известных брендов
-        for brand in self._brands:
-            if brand.lower() in title_lower:
+        # Поиск среди известных брендов за один проход по заголовку
+        if self._brand_automaton is not None:
+            for _, brand in self._brand_automaton.iter(title_lower):
                 return brand
         
         # Резервный поиск по английским словам
@@ -314,7 +411,7 @@ class ProductGenerator(BaseParser):
             if is_english(word) and len(word) > 2:  # Исключаем короткие слова
                 return word.title()
         
-        logger.warning(f"Бренд не обнаружен для: {title}")
+        logger.warning(f"Бренд не обнаружен для: {title_lower}")
         return "Unknown"
     
     def create_product(
@@ -346,7 +443,7 @@ class ProductGenerator(BaseParser):
             specification: Спецификация
             documentation: Документация
             accessories: Аксессуары
-            
+        
         Returns:
             Созданный объект Product
         """
@@ -363,5 +460,5 @@ class ProductGenerator(BaseParser):
             specification=specification or {},
             documentation=documentation or {},
             accessories=accessories or [],
-            brand=self._find_brand(title)
+            brand=self._find_brand(title.lower())
         )
\ No newline at end of file
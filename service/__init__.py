@@ -1,165 +1,262 @@
 import asyncio
+import csv
 
 from pathlib import Path
 from typing import List, NoReturn, Optional
 
 import aiohttp
-import aiofiles
-import aiocsv
 import pandas as pd
 
 from loguru import logger
 
+from core.base import create_bucket
+from core.limits import AdaptiveLimiter
 from core.urls import DigisManager
-from core.parser import ConcreteDigisParser
+from core.parser import PARSER_BACKENDS
 from models import ProductGenerator, Product
 
+
+def _load_urls(urls_path: str | Path) -> List[str]:
+    """
+    Читает список URL продуктов из файла.
+    
+    Args:
+        urls_path: Файл .parquet/.csv (сохраняет DigisManager) или Excel с колонкой URL
+        
+    Returns:
+        Список URL
+    """
+    # Читаем только колонку URL, остальные колонки в память не попадают
+    suffix = Path(urls_path).suffix.lower()
+    if suffix == '.parquet':
+        data = pd.read_parquet(urls_path, columns=["URL"])
+    elif suffix == '.csv':
+        data = pd.read_csv(urls_path, usecols=["URL"])
+    else:
+        data = pd.read_excel(urls_path, usecols=["URL"])
+    
+    return data["URL"].tolist()
+
+
+def _write_rows(fp_csv: str | Path, rows: List[List[str]], mode: str = 'a') -> None:
+    """
+    Записывает строки в CSV файл одним вызовом (выполняется в отдельном потоке).
+    
+    Args:
+        fp_csv: Путь к CSV файлу
+        rows: Строки для записи
+        mode: Режим открытия файла
+    """
+    with open(fp_csv, mode, newline='', encoding='utf-8') as file:
+        csv.writer(file).writerows(rows)
+
+
 class DigisAPI:
+    """
+    Парсинг каталога Digis в CSV.
+    
+    Сессию нужно создавать через core.base.create_session с тем же
+    max_workers. Одновременные запросы всех парсеров ограничивает один
+    общий AdaptiveLimiter (не больше max_workers), коннектор сессии
+    с тем же лимитом служит только верхней границей.
+    """
+    
     def __init__(
         self, 
         session: aiohttp.ClientSession,
         base_url: str,
-        parse_engine: str = 'html.parser',
+        parse_engine: str = 'lxml',
         *,
         max_workers: int = 5,
-        sleep_time: int = 3
+        sleep_time: int = 3,
+        backend: str = 'bs4'
     ):
-        self._digis_manager = DigisManager(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time)
-        self._product_parser = ConcreteDigisParser(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time)
-        self._generator = ProductGenerator(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time) 
+        if backend not in PARSER_BACKENDS:
+            raise ValueError(f"Неизвестный backend парсера: {backend}, доступны: {', '.join(PARSER_BACKENDS)}")
+        
+        # Один ограничитель и один token bucket на все парсеры: их запросы идут через общий
+        # пул соединений, а обход каталога и парсинг продуктов выполняются одновременно
+        limiter = AdaptiveLimiter(max_workers, max_limit=max_workers)
+        bucket = create_bucket(max_workers=max_workers, sleep_time=sleep_time)
+        self._digis_manager = DigisManager(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time, limiter=limiter, bucket=bucket)
+        self._product_parser = PARSER_BACKENDS[backend](session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time, limiter=limiter, bucket=bucket)
+        self._generator = ProductGenerator(session, base_url, parse_engine, max_workers=max_workers, sleep_time=sleep_time, limiter=limiter, bucket=bucket)
         self.max_worker = max_workers
+        # Отпечатки уже записанных продуктов (Product.quick_fingerprint)
+        self._seen_products: set[int] = set()
     
     async def start_parsing(
         self, 
         fp_csv: str | Path, 
         safe_urls: bool,
         *,
-        batch_size: int = 1000, 
-        urls_path: str | Path | None = None
+        urls_path: str | Path | None = None,
+        batch_size: int = 100
     ) -> NoReturn:
         """
         Запускает парсинг продуктов с ограничением одновременных запросов.
         
+        URL продуктов передаются парсерам через очередь сразу по мере
+        обнаружения, поэтому парсинг начинается, не дожидаясь окончания
+        обхода каталога.
+        
         Args:
             fp_csv: Путь к CSV файлу для сохранения
             safe_urls: Использовать безопасные URL
-            max_concurrent: Максимальное количество одновременных запросов
-            batch_size: Размер батча для обработки URL
+            urls_path: Путь к файлу с готовым списком URL (вместо обхода каталога)
+            batch_size: Количество строк, накапливаемых перед записью в файл
             
         Raises:
             IOError: Ошибки записи в файл
             Exception: Критические ошибки парсинга
+            ExceptionGroup: Если одновременно упало несколько задач
         """
         logger.info(f"Начало парсинга с {self.max_worker} одновременными запросами")
         
         try:
-            # Инициализация данных
-            await self._generator.update()
-            if not urls_path:
-                urls = len(await self._digis_manager.extract_all_urls(safe_urls))
-            else:
-                urls = []
-                data = pd.read_excel(urls_path)
-                for indx, line in data.iterrows():
-                    urls.append(line["URL"])
-            logger.info(f"Найдено {len(urls)} URL для парсинга")
+            # Ограниченные очереди: в памяти одновременно не больше 2 * max_worker URL и продуктов,
+            # None - сигнал завершения
+            queue: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=self.max_worker * 2)
+            out_queue: asyncio.Queue[Optional[Product]] = asyncio.Queue(maxsize=self.max_worker * 2)
+            stats = {'successful': 0, 'failed': 0, 'duplicates': 0}
+            self._seen_products.clear()
             
-            # Создание семафора для ограничения одновременных запросов
-            semaphore = asyncio.Semaphore(self.max_worker)
+            # Записываем заголовки
+            headers = [
+                "Название", "Короткое описание", "Полное описание", "Код Digis", "Артикул", "Цена", "Изображении", "Спецификации", "Документации", "Аксессуары", "Бренд"
+            ]
+            await asyncio.to_thread(_write_rows, fp_csv, [headers], 'w')
             
-            async with aiofiles.open(fp_csv, 'w', newline='', encoding='utf-8') as file:
-                csv_writer = aiocsv.AsyncWriter(file)
+            # Ошибка в любой задаче отменяет остальные
+            async with asyncio.TaskGroup() as group:
+                # Обход каталога начинается сразу, параллельно с загрузкой брендов и курса;
+                # до запуска парсеров он успевает заполнить очередь
+                producer = group.create_task(self._produce_urls(queue, safe_urls, urls_path))
                 
-                # Записываем заголовки
-                headers = [
-                    "Название", "Короткое описание", "Полное описание", "Код Digis", "Артикул", "Цена", "Изображении", "Спецификации", "Документации", "Аксессуары", "Бренд"
-                ]
-                await csv_writer.writerow(headers)
+                # Бренды и курс нужны для создания продуктов, поэтому парсеры ждут их
+                await self._generator.update()
                 
-                # Обработка URL батчами для экономии памяти
-                successful = 0
-                failed = 0
+                group.create_task(self._write_products(out_queue, fp_csv, batch_size, stats))
+                workers = [
+                    group.create_task(self._consume_urls(queue, out_queue, stats))
+                    for _ in range(self.max_worker)
+                ]
                 
-                for batch_start in range(0, len(urls), batch_size):
-                    batch_urls = urls[batch_start:batch_start + batch_size]
-                    logger.info(f"Обработка батча {batch_start//batch_size + 1}/{(len(urls)-1)//batch_size + 1}")
-                    
-                    batch_results = await self._process_batch(
-                        batch_urls, semaphore, csv_writer
-                    )
-                    successful += batch_results['successful']
-                    failed += batch_results['failed']
-
-                    if hasattr(asyncio, 'sleep'):
-                        await asyncio.sleep(0.1)  # Даем event loop передохнуть
+                found = await producer
+                logger.info(f"Найдено {found} URL для парсинга")
                 
-                logger.info(f"Парсинг завершен. Успешно: {successful}, Ошибок: {failed}")
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+                await out_queue.put(None)
+            
+            logger.info(f"Парсинг завершен. Успешно: {stats['successful']}, Ошибок: {stats['failed']}, Дублей: {stats['duplicates']}")
                 
         except Exception as e:
-            logger.error(f"Критическая ошибка при парсинге: {e}")
+            # Ошибки задач TaskGroup приходят в ExceptionGroup, логируем каждую причину
+            errors = list(dict.fromkeys(e.exceptions)) if isinstance(e, ExceptionGroup) else [e]
+            for error in errors:
+                logger.error(f"Критическая ошибка при парсинге: {error}")
+            if len(errors) == 1:
+                raise errors[0] from None
             raise
     
-    async def _process_batch(
+    async def _produce_urls(
         self,
-        urls: List[str],
-        semaphore: asyncio.Semaphore,
-        csv_writer: aiocsv.AsyncWriter
-    ) -> dict[str, int]:
+        queue: asyncio.Queue,
+        safe_urls: bool,
+        urls_path: str | Path | None
+    ) -> int:
         """
-        Обрабатывает батч URL с ограничением одновременных запросов.
+        Заполняет очередь URL продуктов.
         
         Args:
-            urls: Список URL для обработки
-            semaphore: Семафор для ограничения concurrent запросов
-            csv_writer: CSV writer для записи результатов
+            queue: Очередь URL для парсеров
+            safe_urls: Сохранить найденные URL в файл
+            urls_path: Путь к файлу с готовым списком URL
             
         Returns:
-            Статистика обработки батча
+            Количество найденных URL
         """
-        tasks = []
-        for url in urls:
-            task = self._create_limited_task(url, semaphore)
-            tasks.append(task)
+        if not urls_path:
+            return len(await self._digis_manager.extract_all_urls(safe_urls, queue))
         
-        successful = 0
-        failed = 0
+        urls = _load_urls(urls_path)
+        for url in urls:
+            await queue.put(url)
+        return len(urls)
+    
+    async def _consume_urls(
+        self,
+        queue: asyncio.Queue,
+        out_queue: asyncio.Queue,
+        stats: dict[str, int]
+    ) -> None:
+        """
+        Забирает URL из очереди, парсит продукты и передаёт их на запись.
         
-        async for task in asyncio.as_completed(tasks):
+        Args:
+            queue: Очередь URL, None означает завершение работы
+            out_queue: Очередь продуктов для записи в CSV
+            stats: Общая статистика обработки
+        """
+        while (url := await queue.get()) is not None:
             try:
-                product_data = await task
-                if product_data:
-                    product = self._generator.create_product(**product_data)
-                    await csv_writer.writerow(self._get_product_row(product))
-                    successful += 1
+                product_data = await self._product_parser.parse_product(url)
+                if not product_data:
+                    stats['failed'] += 1
+                    continue
+                
+                product = self._generator.create_product(**product_data)
                     
-                    if successful % 50 == 0:
-                        logger.info(f"Обработано продуктов: {successful}")
-                        
             except Exception as e:
-                failed += 1
-                logger.warning(f"Ошибка обработки продукта: {e}")
-        
-        return {'successful': successful, 'failed': failed}
+                stats['failed'] += 1
+                logger.warning(f"Ошибка обработки продукта {url}: {e}")
+                continue
+            
+            await out_queue.put(product)
     
-    async def _create_limited_task(self, url: str, semaphore: asyncio.Semaphore) -> Optional[dict]:
+    async def _write_products(
+        self,
+        out_queue: asyncio.Queue,
+        fp_csv: str | Path,
+        batch_size: int,
+        stats: dict[str, int]
+    ) -> None:
         """
-        Создает задачу с ограничением через семафор.
+        Единственный писатель CSV: отбрасывает дубли и пишет строки пачками.
         
         Args:
-            url: URL для парсинга
-            semaphore: Семафор для ограничения
-            
-        Returns:
-            Данные продукта или None при ошибке
+            out_queue: Очередь продуктов, None означает завершение работы
+            fp_csv: Путь к CSV файлу для сохранения
+            batch_size: Количество строк, накапливаемых перед записью в файл
+            stats: Общая статистика обработки
         """
-        async with semaphore:
-            try:
-                return await self._product_parser.parse_product(url)
-            except Exception as e:
-                logger.warning(f"Ошибка парсинга {url}: {e}")
-                return None
+        rows: List[List[str]] = []
+        while (product := await out_queue.get()) is not None:
+            # Продукты без кода Digis и артикула не дедуплицируются
+            fingerprint = product.quick_fingerprint
+            if fingerprint is not None:
+                if fingerprint in self._seen_products:
+                    stats['duplicates'] += 1
+                    logger.debug("Пропущен дубль продукта: {}", product.title)
+                    continue
+                self._seen_products.add(fingerprint)
+            
+            rows.append(self._get_product_row(product))
+            stats['successful'] += 1
+            
+            if stats['successful'] % 50 == 0:
+                logger.info(f"Обработано продуктов: {stats['successful']}")
+            
+            if len(rows) >= batch_size:
+                await asyncio.to_thread(_write_rows, fp_csv, rows)
+                rows = []
+        
+        if rows:
+            await asyncio.to_thread(_write_rows, fp_csv, rows)
     
-    def _get_product_row(self, product: 'Product', default: str = '-') -> List[str]:
+    def _get_product_row(self, product: 'Product') -> List[str]:
         """
         Подготавливает строку продукта для CSV.
         
@@ -170,17 +267,4 @@ class DigisAPI:
             Список значений для записи в CSV
         #"Название", "Короткое описание", "Код Digis", "Артикул", "Цена", "Изображении", "Спецификации", "Документации", "Аксессуары", "Бренд"
         """
-        flat_dict = product.as_flat_dict()
-        return [
-            flat_dict.get("Название", default),
-            flat_dict.get("Короткое описание", default),
-            flat_dict.get("Полное описание", default),
-            flat_dict.get("Код Digis", default),
-            flat_dict.get("Артикул", default),
-            flat_dict.get("Цена", default),
-            flat_dict.get("Изображение", default),
-            flat_dict.get("Спецификации", default),
-            flat_dict.get("Документация", default),
-            flat_dict.get("Аксессуары", default),
-            flat_dict.get("Бренд", default),
-        ]
\ No newline at end of file
+        return product.as_csv_row()
@@ -0,0 +1,36 @@
+import unittest
+
+from core.base import ALREADY_FETCHED, BaseParser
+
+
+class HeaderPoolTest(unittest.TestCase):
+    """Ротируемые заголовки запросов."""
+    
+    def test_pool_only_rotates_user_agent(self):
+        parser = BaseParser(None, 'https://digis.ru')
+        for headers in parser._hdr_pool:
+            self.assertEqual(set(headers), {'User-Agent'})
+        self.assertEqual(set(parser._get_headers()), {'User-Agent'})
+
+
+class FetchOnceTest(unittest.IsolatedAsyncioTestCase):
+    """Однократная загрузка страницы через _fetch_once."""
+    
+    async def test_failed_page_can_be_retried(self):
+        parser = BaseParser(None, 'https://digis.ru')
+        results = [None, 'page']
+        calls = []
+        
+        async def fetch(url, *args, **kwargs):
+            calls.append(url)
+            return results.pop(0)
+        
+        parser._fetch = fetch
+        self.assertIsNone(await parser._fetch_once('https://digis.ru/cat/1'))
+        self.assertEqual(await parser._fetch_once('https://digis.ru/cat/1'), 'page')
+        self.assertIs(await parser._fetch_once('https://digis.ru/cat/1'), ALREADY_FETCHED)
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import math
+import time
+import unittest
+
+from core.limits import AdaptiveLimiter, ServiceOverloadError, TokenBucket
+
+
+class AdaptiveLimiterTest(unittest.IsolatedAsyncioTestCase):
+    """Изменение лимита AdaptiveLimiter."""
+    
+    async def test_grows_while_rtt_is_minimal(self):
+        limiter = AdaptiveLimiter(2, max_limit=4)
+        for _ in range(5):
+            limiter._on_success(0.1)
+        self.assertEqual(limiter.limit, 4)
+    
+    async def test_shrinks_when_rtt_grows(self):
+        limiter = AdaptiveLimiter(10, min_limit=8)
+        limiter._on_success(0.1)
+        limiter._on_success(1.0)
+        self.assertEqual(limiter.limit, 10)
+        limiter._on_success(1.0)
+        limiter._on_success(1.0)
+        limiter._on_success(1.0)
+        self.assertEqual(limiter.limit, 8)
+    
+    async def test_keeps_limit_in_between(self):
+        limiter = AdaptiveLimiter(10)
+        limiter._on_success(0.1)
+        self.assertEqual(limiter.limit, 11)
+        # Оценка очереди 11 * (1 - 0.1 / 0.13) ~ 2.5, между alpha и beta
+        limiter._on_success(0.13)
+        self.assertEqual(limiter.limit, 11)
+    
+    async def test_halves_on_overload(self):
+        limiter = AdaptiveLimiter(8)
+        with self.assertRaises(ServiceOverloadError):
+            async with limiter.use():
+                raise ServiceOverloadError(429)
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter._in_flight, 0)
+        
+        for _ in range(5):
+            limiter._on_overload()
+        self.assertEqual(limiter.limit, 1)
+    
+    async def test_limits_concurrency(self):
+        limiter = AdaptiveLimiter(2, max_limit=2)
+        active = 0
+        peak = 0
+        
+        async def request():
+            nonlocal active, peak
+            async with limiter.use():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+        
+        await asyncio.gather(*(request() for _ in range(6)))
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter._in_flight, 0)
+
+
+class TokenBucketTest(unittest.IsolatedAsyncioTestCase):
+    """Ограничение частоты запросов TokenBucket."""
+    
+    async def test_burst_up_to_capacity(self):
+        bucket = TokenBucket(rate=1, capacity=3)
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        self.assertLess(time.monotonic() - started, 0.05)
+    
+    async def test_paces_after_burst(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        started = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        # Первый токен из запаса, остальные 5 по 1/50 секунды
+        self.assertGreaterEqual(time.monotonic() - started, 5 / 50 * 0.9)
+    
+    async def test_infinite_rate_does_not_wait(self):
+        bucket = TokenBucket(rate=math.inf, capacity=1)
+        started = time.monotonic()
+        for _ in range(100):
+            await bucket.acquire()
+        self.assertLess(time.monotonic() - started, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
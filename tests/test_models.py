@@ -0,0 +1,90 @@
+import unittest
+
+from models import Product, ProductGenerator
+
+
+def make_product(**overrides) -> Product:
+    fields = dict(
+        title='Камера Hikvision DS-2CD', short_description='', full_description='',
+        code_digis=123456, article='DS-2CD', price=12990, posters=[],
+        characteristics={}, specification={}, documentation=[], accessories=[], brand='Hikvision'
+    )
+    fields.update(overrides)
+    return Product(**fields)
+
+
+class SafeExtractPriceTest(unittest.TestCase):
+    """Разбор цены в ProductGenerator._safe_extract_price."""
+    
+    def setUp(self):
+        self.generator = ProductGenerator(None, 'https://digis.ru')
+        self.generator._rub_exchange_rate_x100 = 9012
+    
+    def test_rub_integer(self):
+        self.assertEqual(self.generator._safe_extract_price('12 990 руб'), 12990)
+    
+    def test_rub_comma_decimal(self):
+        self.assertEqual(self.generator._safe_extract_price('1299,99руб'), 1299)
+    
+    def test_usd_comma_decimal(self):
+        self.assertEqual(self.generator._safe_extract_price('12,5USD'), 1081)
+        self.assertEqual(self.generator._safe_extract_price('1 299,99 USD'), 117066)
+    
+    def test_usd_thousands_separator(self):
+        self.assertEqual(self.generator._safe_extract_price('1,299.99 USD'), 117066)
+
+
+class QuickFingerprintTest(unittest.TestCase):
+    """Отпечаток для дедупликации продуктов в DigisAPI."""
+    
+    def test_same_offer_same_fingerprint(self):
+        self.assertEqual(
+            make_product().quick_fingerprint,
+            make_product(title='Другое название').quick_fingerprint
+        )
+    
+    def test_different_price(self):
+        self.assertNotEqual(make_product().quick_fingerprint, make_product(price=1).quick_fingerprint)
+    
+    def test_no_sku_not_deduplicated(self):
+        self.assertIsNone(make_product(code_digis=0, article='').quick_fingerprint)
+        self.assertIsNone(make_product(article='').quick_fingerprint)
+        self.assertIsNone(make_product(code_digis=0).quick_fingerprint)
+
+
+class CsvRowTest(unittest.TestCase):
+    """Строка CSV и плоский словарь продукта."""
+    
+    def test_csv_row(self):
+        product = make_product(posters=['a.jpg', 'b.jpg'], specification={'Вес': '1 кг'})
+        self.assertEqual(product.as_csv_row(), [
+            'Камера Hikvision DS-2CD', 'Нет', 'Нет', '123456', 'DS-2CD', '12 990 ₽',
+            'a.jpg; b.jpg', 'Вес: 1 кг', 'Нет', 'Нет', 'Hikvision'
+        ])
+    
+    def test_flat_dict_matches_csv_row(self):
+        product = make_product(documentation=['doc.pdf'], accessories=['acc'])
+        flat = product.as_flat_dict()
+        self.assertEqual(list(flat.values()), product.as_csv_row())
+        self.assertEqual(flat['Изображение'], '')
+        self.assertEqual(flat['Документация'], 'doc.pdf')
+        self.assertEqual(flat['Цена'], '12 990 ₽')
+
+
+class UpdateBrandsTest(unittest.IsolatedAsyncioTestCase):
+    """Список брендов со страницы поставщиков."""
+    
+    async def test_uses_page_charset(self):
+        html = '<ul class="row"><li><img title="Бирюса"></li><li><img title="Hikvision"></li></ul>'.encode()
+        generator = ProductGenerator(None, 'https://digis.ru')
+        
+        async def fetch(url, *args, raw=False, **kwargs):
+            return html, 'utf-8'
+        
+        generator._fetch = fetch
+        await generator.update_brands()
+        self.assertEqual(generator._brands, {'бирюса': 'Бирюса', 'hikvision': 'Hikvision'})
+
+
+if __name__ == '__main__':
+    unittest.main()
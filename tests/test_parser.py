@@ -0,0 +1,84 @@
+import unittest
+
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from core.base import resolve_charset
+from core.parser import PARSER_BACKENDS, _PRODUCT_STRAINER
+
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+PRODUCT_HTML = (FIXTURES / 'product.html').read_bytes()
+# Та же страница без <meta charset>: кодировка известна только из Content-Type
+PRODUCT_NOMETA_HTML = (FIXTURES / 'product_nometa.html').read_bytes()
+
+
+class ProductStrainerTest(unittest.TestCase):
+    """Блоки страницы продукта, которые оставляет TagStrainer."""
+    
+    def setUp(self):
+        self.soup = BeautifulSoup(PRODUCT_HTML, 'lxml', parse_only=_PRODUCT_STRAINER)
+    
+    def test_keeps_blocks_read_by_parsers(self):
+        self.assertEqual(self.soup.h1.get_text(strip=True), 'Камера Hikvision DS-2CD')
+        for selector in (
+            '.prod-detail-head-desc', '.prod-detail-box-buy-head .list-props', 'div.price .val',
+            '#prod-gallery .swiper-slide', '#tab_description', '#tab_features tr',
+            '#tab_specification tr', '#tab_documentation .td-btn a', '#tab_accessories .col-body a',
+        ):
+            with self.subTest(selector=selector):
+                self.assertIsNotNone(self.soup.select_one(selector))
+    
+    def test_drops_other_markup(self):
+        self.assertIsNone(self.soup.select_one('.header'))
+        self.assertIsNone(self.soup.select_one('.footer'))
+        self.assertIsNone(self.soup.select_one('link[rel="canonical"]'))
+
+
+class ParserBackendsTest(unittest.IsolatedAsyncioTestCase):
+    """Все backend'ы парсера продукта дают одинаковый результат."""
+    
+    EXPECTED = {
+        'title': 'Камера Hikvision DS-2CD',
+        'short_description': 'Короткое описание',
+        'full_description': 'Полное описание',
+        'code_digis': 123456,
+        'article': ' DS-2CD',
+        'price': '12 990 руб',
+        'poster': ['https://digis.ru/img/1.jpg', 'https://digis.ru/img/2s.jpg'],
+        'characteristics': {'Цвет': 'Черный', 'Вес': '1 кг'},
+        'specification': {'Спец': 'Знач'},
+        'documentation': ['https://digis.ru/doc.pdf'],
+        'accessories': ['https://digis.ru/acc/1'],
+    }
+    
+    async def _parse(self, backend: str, html: bytes = PRODUCT_HTML, charset: str | None = None) -> dict:
+        parser = PARSER_BACKENDS[backend](None, 'https://digis.ru')
+        
+        async def fetch(url, *args, raw=False, strainer=None, **kwargs):
+            if raw:
+                return html, resolve_charset(html, charset)
+            return BeautifulSoup(html, parser.parse_engine, parse_only=strainer, from_encoding=charset)
+        
+        parser._fetch = fetch
+        return await parser.parse_product('https://digis.ru/product/1')
+    
+    async def test_backends_agree(self):
+        for backend in PARSER_BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertEqual(await self._parse(backend), self.EXPECTED)
+    
+    async def test_lxml_uses_header_charset(self):
+        product = await self._parse('lxml', PRODUCT_NOMETA_HTML, 'utf-8')
+        self.assertEqual(product, self.EXPECTED)
+    
+    async def test_windows_1251_page(self):
+        html = PRODUCT_HTML.decode().replace('utf-8', 'windows-1251').encode('windows-1251')
+        for backend in PARSER_BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertEqual(await self._parse(backend, html), self.EXPECTED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import csv
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from service import DigisAPI
+from tests.test_models import make_product
+
+
+class WriteProductsTest(unittest.IsolatedAsyncioTestCase):
+    """Запись продуктов в CSV с пропуском дублей."""
+    
+    async def asyncSetUp(self):
+        self.api = DigisAPI(None, 'https://digis.ru')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.fp_csv = Path(self.tmp.name) / 'out.csv'
+    
+    async def asyncTearDown(self):
+        self.tmp.cleanup()
+    
+    async def _write(self, products):
+        queue = asyncio.Queue()
+        for product in products:
+            queue.put_nowait(product)
+        queue.put_nowait(None)
+        
+        stats = {'successful': 0, 'failed': 0, 'duplicates': 0}
+        await self.api._write_products(queue, self.fp_csv, 2, stats)
+        with open(self.fp_csv, newline='', encoding='utf-8') as file:
+            return list(csv.reader(file)), stats
+    
+    async def test_duplicates_skipped(self):
+        rows, stats = await self._write([make_product(), make_product(), make_product(price=1)])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(stats['duplicates'], 1)
+    
+    async def test_products_without_sku_kept(self):
+        rows, stats = await self._write([
+            make_product(title='Кабель', code_digis=0, article=''),
+            make_product(title='Разъём', code_digis=0, article=''),
+        ])
+        self.assertEqual([row[0] for row in rows], ['Кабель', 'Разъём'])
+        self.assertEqual(stats['duplicates'], 0)
+
+
+class StartParsingErrorsTest(unittest.IsolatedAsyncioTestCase):
+    """Ошибки задач start_parsing не теряются в ExceptionGroup."""
+    
+    async def test_producer_error_is_unwrapped(self):
+        api = DigisAPI(None, 'https://digis.ru')
+        
+        async def update():
+            pass
+        
+        async def produce_urls(queue, safe_urls, urls_path):
+            raise ValueError("Не удалось получить обязательный уровень")
+        
+        api._generator.update = update
+        api._produce_urls = produce_urls
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaisesRegex(ValueError, "обязательный уровень"):
+                await api.start_parsing(Path(tmp) / 'out.csv', False)
+
+
+class SharedLimiterTest(unittest.TestCase):
+    """Общие ограничители запросов для всех парсеров DigisAPI."""
+    
+    def test_parsers_share_limiter_and_bucket(self):
+        api = DigisAPI(None, 'https://digis.ru', max_workers=4)
+        limiter = api._generator._limiter
+        for parser in (
+            api._digis_manager,
+            api._digis_manager._urls_extracter,
+            api._digis_manager._pagination,
+            api._product_parser,
+        ):
+            self.assertIs(parser._limiter, limiter)
+            self.assertIs(parser._bucket, api._generator._bucket)
+        # Лимит не превышает лимит коннектора create_session
+        self.assertEqual(limiter.max_limit, 4)
+        self.assertEqual(api._generator._bucket.capacity, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
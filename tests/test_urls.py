@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+
+from collections import Counter
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from core.base import create_session
+from core.urls import DigisManager
+
+
+def _page(body: str) -> web.Response:
+    return web.Response(text=f'<html><body>{body}</body></html>', content_type='text/html')
+
+
+class ExtractAllUrlsTest(unittest.IsolatedAsyncioTestCase):
+    """Обход каталога DigisManager на небольшом локальном сайте."""
+    
+    async def asyncSetUp(self):
+        self.hits: Counter[str] = Counter()
+        
+        async def distribution(request):
+            # Первая рубрика указана дважды
+            links = ''.join(f'<div class="lvl-1"><a class="ttl" href="/l1/{i}">c</a></div>' for i in (0, 0, 1))
+            return _page(f'<div id="main-rubrics">{links}</div>')
+        
+        async def rubric(request):
+            # Обе рубрики ссылаются на одни и те же категории
+            links = ''.join(f'<a href="/cat/{j}">x</a>' for j in range(3))
+            return _page(f'<div class="rubric-list row flex flex-wrap">{links}</div>')
+        
+        async def category(request):
+            self.hits[request.path_qs] += 1
+            j = int(request.match_info['j'])
+            page = int(request.query.get('PAGEN_1', 1))
+            # Продукты пересекаются между категориями и страницами
+            rows = ''.join(f'<tr><td><a href="/p/{(j + page + k) % 7}">p</a></td></tr>' for k in range(3))
+            pager = '<div class="pager-pages-list line-items"><a>1</a><a>2</a><span>3</span></div>'
+            return _page(f'<table class="list-prods"><tbody>{rows}</tbody></table>{pager}')
+        
+        app = web.Application()
+        app.router.add_get('/distribution', distribution)
+        app.router.add_get('/l1/{i}', rubric)
+        app.router.add_get('/cat/{j}', category)
+        
+        self.server = TestServer(app)
+        await self.server.start_server()
+        base_url = str(self.server.make_url(''))
+        
+        self.session = create_session(base_url)
+        self.manager = DigisManager(self.session, base_url, sleep_time=0)
+        self.manager._urls_extracter.DISTRIBUTION_URL = str(self.server.make_url('/distribution'))
+    
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+    
+    async def test_pages_fetched_once_and_products_queued_once(self):
+        queue: asyncio.Queue = asyncio.Queue()
+        urls = await self.manager.extract_all_urls(save=False, queue=queue)
+        
+        self.assertEqual(len(urls), 7)
+        self.assertEqual(max(self.hits.values()), 1)
+        self.assertEqual(len(self.hits), 3 * 3)
+        
+        queued = [queue.get_nowait() for _ in range(queue.qsize())]
+        self.assertCountEqual(queued, urls)
+    
+    async def test_repeated_extraction(self):
+        first = await self.manager.extract_all_urls(save=False)
+        second = await self.manager.extract_all_urls(save=False)
+        self.assertEqual(first, second)
+        self.assertEqual(set(self.hits.values()), {2})
+
+
+class RubricAsCategoryTest(unittest.IsolatedAsyncioTestCase):
+    """Рубрика, которая одновременно является категорией с продуктами."""
+    
+    async def asyncSetUp(self):
+        async def distribution(request):
+            return _page('<div id="main-rubrics"><div class="lvl-1"><a class="ttl" href="/l1/0">c</a></div></div>')
+        
+        async def rubric(request):
+            # Рубрика ссылается сама на себя как на категорию
+            return _page(
+                '<div class="rubric-list row flex flex-wrap"><a href="/l1/0">x</a></div>'
+                '<table class="list-prods"><tbody><tr><td><a href="/p/0">p</a></td></tr></tbody></table>'
+            )
+        
+        app = web.Application()
+        app.router.add_get('/distribution', distribution)
+        app.router.add_get('/l1/0', rubric)
+        
+        self.server = TestServer(app)
+        await self.server.start_server()
+        base_url = str(self.server.make_url(''))
+        
+        self.session = create_session(base_url)
+        self.manager = DigisManager(self.session, base_url, sleep_time=0)
+        self.manager._urls_extracter.DISTRIBUTION_URL = str(self.server.make_url('/distribution'))
+    
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+    
+    async def test_products_collected(self):
+        urls = await self.manager.extract_all_urls(save=False)
+        self.assertEqual(urls, {str(self.server.make_url('/p/0'))})
+
+
+if __name__ == '__main__':
+    unittest.main()
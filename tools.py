@@ -1,10 +1,28 @@
 import re
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from typing import Optional, Union
 
 from loguru import logger
 
 
+# Паттерны для чисел в порядке приоритета. Отдельные положительные варианты
+# не нужны: '-?' уже покрывает их, а '-?\d+' находит любое число в тексте
+_NUMBER_PATTERNS = (
+    # Дробные числа
+    re.compile(r'-?\d{1,3}(?:[ ,]\d{3})*\.\d+'),
+    # Целые числа с разделителями
+    re.compile(r'-?\d{1,3}(?:[ ,]\d{3})+'),
+    # Целые числа
+    re.compile(r'-?\d+'),
+)
+
+
+@lru_cache(maxsize=8)
+def _english_words_re(min_word_length: int) -> re.Pattern:
+    return re.compile(r'\b[A-Za-z]{%d,}\b' % min_word_length)
+
+
 def extract_number(text: str, *, default: Optional[Union[int, float]] = None) -> Optional[Union[int, float]]:
     """
     Извлекает первое число из текста с поддержкой целых, дробных и отрицательных чисел.
@@ -28,24 +46,8 @@ def extract_number(text: str, *, default: Optional[Union[int, float]] = None) ->
         logger.warning(f"Некорректный входной текст: {text}")
         return default
     
-    # Паттерн для чисел: целые, дробные, отрицательные, с разделителями
-    patterns = [
-        # Отрицательные дробные числа
-        r'-?\d{1,3}(?:[ ,]\d{3})*\.\d+',
-        # Отрицательные целые числа с разделителями
-        r'-?\d{1,3}(?:[ ,]\d{3})+',
-        # Отрицательные целые числа
-        r'-?\d+',
-        # Положительные дробные числа
-        r'\d{1,3}(?:[ ,]\d{3})*\.\d+',
-        # Положительные целые числа с разделителями
-        r'\d{1,3}(?:[ ,]\d{3})+',
-        # Положительные целые числа
-        r'\d+'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in _NUMBER_PATTERNS:
+        match = pattern.search(text)
         if match:
             number_str = match.group().replace(' ', '').replace(',', '')
             try:
@@ -60,7 +62,7 @@ def extract_number(text: str, *, default: Optional[Union[int, float]] = None) ->
                 logger.warning(f"Не удалось преобразовать '{number_str}' в число: {e}")
                 continue
     
-    logger.debug(f"Числа не найдены в тексте: '{text[:50]}...'")
+    logger.debug("Числа не найдены в тексте: '{}...'", text[:50])
     return default
 
 
@@ -84,6 +86,12 @@ def get_integer(text: str, *, default: int = 0) -> int:
         >>> get_integer("Скидка -15%")
         -15
     """
+    # Без точки и разделителей совпасть может только паттерн целого числа
+    if isinstance(text, str) and '.' not in text and ' ' not in text and ',' not in text:
+        match = _NUMBER_PATTERNS[-1].search(text)
+        if match:
+            return int(match.group())
+    
     result = extract_number(text, default=default)
     
     if result is None:
@@ -179,8 +187,7 @@ def contains_english_words(text: str, min_word_length: int = 2) -> bool:
         return False
     
     # Ищем слова, состоящие только из английских букв
-    english_words = re.findall(r'\b[A-Za-z]{%d,}\b' % min_word_length, text)
-    return len(english_words) > 0
+    return _english_words_re(min_word_length).search(text) is not None
 
 
 def extract_english_words(text: str, min_word_length: int = 2) -> list[str]:
@@ -197,7 +204,7 @@ def extract_english_words(text: str, min_word_length: int = 2) -> list[str]:
     if not text:
         return []
     
-    return re.findall(r'\b[A-Za-z]{%d,}\b' % min_word_length, text)
+    return _english_words_re(min_word_length).findall(text)
 
 
 # Aliases для обратной совместимости
@@ -224,4 +231,5 @@ def is_english(text: str) -> bool:
     Returns:
         True если текст состоит только из английских букв
     """
-    return is_english_text(text, allow_spaces=False, allow_punctuation=False)
\ No newline at end of file
+    # Только ASCII-буквы: то же, что '^[A-Za-z]+$', но без регулярного выражения
+    return isinstance(text, str) and text.isascii() and text.isalpha()
\ No newline at end of file